@@ -3,6 +3,7 @@
 import pandas as pd
 import reflex as rx
 from reflex_ag_grid import ag_grid
+from reflex_ag_grid.dataframe import dataframe_wrapper
 
 df = pd.read_csv(
     "https://raw.githubusercontent.com/plotly/datasets/master/wind_dataset.csv"
@@ -49,6 +50,8 @@ def index():
             ),
             rx.heading("Other demos"),
             rx.link("Simple ModelWrapper", href="/model"),
+            rx.link("Server-side grouping ModelWrapper", href="/model-ssrm"),
+            rx.link("DataFrameWrapper", href="/dataframe"),
             rx.text(
                 rx.link("Customized ModelWrapper", href="/model-auth"),
                 " (Generate data)",
@@ -68,6 +71,16 @@ def index():
     )
 
 
+# The DataFrame stays on the server, the grid only fetches the visible blocks.
+@rx.page("/dataframe")
+def dataframe_page():
+    return rx.box(
+        dataframe_wrapper(dataframe=df),
+        width="100vw",
+        height="100vh",
+    )
+
+
 # Add state and page to the app.
 app = rx.App()
 app.add_page(index)
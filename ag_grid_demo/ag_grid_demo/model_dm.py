@@ -2,7 +2,8 @@ import datetime
 
 import faker
 import reflex as rx
-from reflex_ag_grid.wrapper import ModelWrapper, model_wrapper
+from reflex_ag_grid.ssrm import model_ssrm_wrapper
+from reflex_ag_grid.wrapper import ModelWrapper, model_wrapper, publish_row_changes
 from sqlmodel import Column, DateTime, Field, func
 
 
@@ -53,6 +54,18 @@ def model_page():
     )
 
 
+# Group and aggregate the friends in the database with the server-side row model
+@rx.page("/model-ssrm")
+def model_ssrm_page():
+    return rx.box(
+        model_ssrm_wrapper(
+            model_class=Friend,
+        ),
+        width="100vw",
+        height="100vh",
+    )
+
+
 # This bogus auth state demonstrates how an extended ModelWrapper can check
 # against values in another state before returning/modifying the data.
 class AuthState(rx.State):
@@ -67,24 +80,33 @@ class AuthState(rx.State):
         return self._refresh_grid()
 
     def _refresh_grid(self):
-        return [cls.on_mount for cls in FriendModelWrapper.__subclasses__()]
+        # mounting again also (re)starts watching the live row changes
+        return [
+            handler
+            for cls in FriendModelWrapper.__subclasses__()
+            for handler in cls._mount_handlers()
+        ]
 
     def generate_friends(self, n: int):
         """If only it were that easy..."""
         if not self._logged_in:
             return rx.toast.error("You must be logged in to generate friends.")
         with rx.session() as session:
-            for f in Friend.generate_fakes(n):
-                session.add(f)
+            friends = Friend.generate_fakes(n)
+            session.add_all(friends)
             session.commit()
-        return [
-            rx.toast.info(f"Created {n} friends."),
-            *self._refresh_grid(),
-        ]
+            for f in friends:
+                session.refresh(f)
+            # every open grid, including this one, shows the new friends
+            publish_row_changes(Friend, added=friends)
+        return rx.toast.info(f"Created {n} friends.")
 
 
 # When extending a ModelWrapper, you can override methods to customize the behavior.
 class FriendModelWrapper(ModelWrapper[Friend]):
+    # Show the rows changed by other sessions as they are written.
+    _live_updates = True
+
     def _get_column_defs(self):
         """In this example, we remove the ability to filter and sort a particular field."""
         cols = super()._get_column_defs()
@@ -94,19 +116,11 @@ class FriendModelWrapper(ModelWrapper[Friend]):
                 col.sortable = False
         return cols
 
-    async def on_value_setter(self, row_data, field_name, value):
-        auth_state = await self.get_state(AuthState)
-        if not auth_state.logged_in:
-            return  # no modification for logged out users
-        return super().on_value_setter(row_data, field_name, value)
-
-    async def _get_data(self, start, end, filter_model, sort_model):
+    async def _is_authorized(self, action, action_data):
+        """Every read and write goes through this check, including row counts."""
         auth_state = await self.get_state(AuthState)
-        if not auth_state.logged_in:
-            return []  # no records for logged out users
-        return super()._get_data(
-            start, end, filter_model=filter_model, sort_model=sort_model
-        )
+        # no records or modifications for logged out users
+        return auth_state.logged_in
 
     @rx.var(cache=True)
     def selected_items(self) -> list[Friend]:
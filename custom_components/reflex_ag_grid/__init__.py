@@ -1,37 +1,68 @@
 from .ag_grid import ag_grid
-from .datasource import Datasource
+from .cache import BlockCache, invalidate_tag
+from .datasource import Datasource, encode_columns
 from .handlers import (
+    CompiledFilter,
     apply_filter_model,
+    apply_row_group_model,
     apply_sort_model,
+    compile_filter_def,
+    compile_filter_model,
+    compile_number_filter,
+    compile_text_filter,
     handle_filter_def,
     handle_filter_model,
     handle_number_filter,
     handle_text_filter,
+    keyset_sort_model,
+    pivot_keys_query,
+    pivot_result_fields,
     where_filter_def,
+    where_group_keys,
+    where_keyset,
     where_number_filter,
     where_text_filter,
 )
+from .ssrm import ModelSSRMWrapper, model_ssrm_wrapper
 from .wrapper import (
     AbstractWrapper,
     ModelWrapper,
     ModelWrapperActionType,
     model_wrapper,
+    publish_row_changes,
 )
 
 __all__ = [
     "AbstractWrapper",
+    "BlockCache",
+    "CompiledFilter",
     "Datasource",
+    "ModelSSRMWrapper",
     "ModelWrapper",
     "ModelWrapperActionType",
     "ag_grid",
     "apply_filter_model",
+    "apply_row_group_model",
     "apply_sort_model",
+    "compile_filter_def",
+    "compile_filter_model",
+    "compile_number_filter",
+    "compile_text_filter",
+    "encode_columns",
     "handle_filter_def",
     "handle_filter_model",
     "handle_number_filter",
     "handle_text_filter",
+    "invalidate_tag",
+    "keyset_sort_model",
+    "model_ssrm_wrapper",
     "model_wrapper",
+    "pivot_keys_query",
+    "pivot_result_fields",
+    "publish_row_changes",
     "where_filter_def",
+    "where_group_keys",
+    "where_keyset",
     "where_number_filter",
     "where_text_filter",
 ]
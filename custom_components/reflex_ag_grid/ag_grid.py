@@ -2,9 +2,10 @@
 
 # For wrapping react guide, visit https://reflex.dev/docs/wrapping-react/overview/
 
+import json
 import os
 from types import SimpleNamespace
-from typing import Any, Callable, Literal, Union
+from typing import Any, Callable, Literal, NamedTuple, Union
 
 import reflex as rx
 from reflex.components.el import Div
@@ -12,6 +13,9 @@ from reflex.components.props import PropsBase
 
 from .datasource import Datasource, SSRMDatasource
 
+# Log the event objects of the grid to the browser console, for debugging.
+LOG_EVENTS = bool(os.getenv("AG_GRID_LOG_EVENTS"))
+
 
 def callback_content(iterable: list[str]) -> str:
     return "; ".join(iterable)
@@ -56,7 +60,7 @@ def _on_cell_event_spec(event: rx.Var) -> list[rx.Var]:
             exclude_non_serializable_keys(
                 event,
                 exclude_keys,
-                True,
+                LOG_EVENTS,
             )
         ),
     ]
@@ -69,7 +73,7 @@ def _on_row_event_spec(event: rx.Var) -> list[rx.Var]:
             exclude_non_serializable_keys(
                 event,
                 exclude_keys,
-                True,
+                LOG_EVENTS,
             )
         ),
     ]
@@ -79,15 +83,49 @@ def _on_column_event_spec(event: rx.Var) -> list[rx.Var]:
     return [
         arrow_callback(
             [
-                f"console.log({event})",
+                *([f"console.log({event})"] if LOG_EVENTS else []),
                 f"let {{type, column, colDef, api, ...rest}} = {event}",
-                "let columnID = column.colId",
+                "let columnID = column?.colId",
                 "return {type, columnID}",
             ]
         ),  # ID of the column being clicked
     ]
 
 
+# Payload fields derived from the non-serializable objects of the grid events.
+EVENT_PAYLOAD_FIELDS = {
+    "colId": "column?.getColId()",
+    "field": "colDef?.field",
+    "rowId": "node?.id",
+}
+
+
+def _projected_event_spec(
+    fields: list[str] | dict[str, str],
+) -> Callable[[rx.Var], list[rx.Var]]:
+    """Event spec sending only the given fields of the event.
+
+    Args:
+        fields: Names of the payload fields, either event keys ("rowIndex"),
+            dotted paths ("data.id", sent as "id") or EVENT_PAYLOAD_FIELDS
+            names ("colId", "rowId"). A dict maps payload keys to paths.
+
+    Returns:
+        The event spec.
+    """
+    if not isinstance(fields, dict):
+        fields = {field.rpartition(".")[2]: field for field in fields}
+    entries = ", ".join(
+        f"{json.dumps(key)}: event?.{EVENT_PAYLOAD_FIELDS.get(path, path.replace('.', '?.'))}"
+        for key, path in fields.items()
+    )
+
+    def _signature(event: rx.Var) -> list[rx.Var]:
+        return [arrow_callback([f"let event = {event}", f"return {{{entries}}}"])]
+
+    return _signature
+
+
 def _on_row_selected(event: rx.Var) -> list[rx.Var]:
     return [
         arrow_callback(
@@ -102,7 +140,7 @@ def _on_row_selected(event: rx.Var) -> list[rx.Var]:
 def _on_cell_value_changed(event: rx.Var) -> list[rx.Var]:
     return [
         rx.Var(
-            f"(() => {{let {{rowIndex, ...rest}} = {event}; console.log({event}) ; return rowIndex}})()"
+            f"(() => {{let {{rowIndex, ...rest}} = {event}; return rowIndex}})()"
         ),  # index of the row being changed
         rx.Var(
             f"(() => {{let {{colDef, ...rest}} = {event}; return colDef.field}})()"
@@ -121,6 +159,133 @@ def _on_selection_change_signature(event: rx.Var) -> list[rx.Var]:
     ]
 
 
+def _on_selection_change_ids_signature(
+    row_id_key: str,
+) -> Callable[[rx.Var], list[rx.Var]]:
+    """Selection changed signature sending the selected ids instead of the rows.
+
+    The first argument is {select_all, ids, filter_model}. When select_all is
+    true, every row matching filter_model is selected except the ids.
+    """
+
+    def _signature(event: rx.Var) -> list[rx.Var]:
+        return [
+            arrow_callback(
+                [
+                    f"let api = {event}.api",
+                    "let filter_model = api.getFilterModel()",
+                    "if (api.getGridOption('rowModelType') === 'serverSide') {"
+                    " let state = api.getServerSideSelectionState();"
+                    " return {select_all: state.selectAll, ids: state.toggledNodes, filter_model} }",
+                    "let ids = api.getSelectedNodes()"
+                    f".filter((node) => node.data).map((node) => node.data.{row_id_key})",
+                    "return {select_all: false, ids, filter_model}",
+                ]
+            ),
+            rx.Var(f"{event}.source"),
+            rx.Var(f"{event}.type"),
+        ]
+
+    return _signature
+
+
+def _event_chain(value: Any, args_spec: Callable) -> rx.EventChain:
+    """Bind event handlers, specs or lambdas to an explicit args_spec."""
+    events = []
+    for event in value if isinstance(value, list) else [value]:
+        if isinstance(event, (rx.event.EventHandler, rx.event.EventSpec)):
+            events.append(rx.event.call_event_handler(event, args_spec))
+        else:
+            events.extend(rx.event.call_event_fn(event, args_spec))
+    return rx.EventChain(events=events, args_spec=args_spec)
+
+
+class EventRateLimit(NamedTuple):
+    """Client-side rate limit of a grid event, applied before it reaches the backend.
+
+    Events of a burst (less than `wait` ms apart) are combined: the first one is
+    sent if `leading`, the last one once the burst ends if `trailing`, and the
+    last one at least every `max_wait` ms while the burst lasts.
+    """
+
+    wait: int
+    max_wait: int | None = None
+    leading: bool = False
+    trailing: bool = True
+
+    @classmethod
+    def throttle(
+        cls, interval: int, leading: bool = True, trailing: bool = True
+    ) -> "EventRateLimit":
+        """Send at most one event every interval ms."""
+        return cls(wait=interval, max_wait=interval, leading=leading, trailing=trailing)
+
+    @classmethod
+    def debounce(
+        cls, delay: int, leading: bool = False, max_wait: int | None = None
+    ) -> "EventRateLimit":
+        """Send the last event once none happened for delay ms."""
+        return cls(wait=delay, max_wait=max_wait, leading=leading, trailing=True)
+
+
+# Rate limiter of the grid event handlers, keyed by grid id and event trigger so
+# that its state survives re-renders.
+_RATE_LIMIT_JS = """
+const agGridRateLimits = {};
+function agGridRateLimit(key, handler, {wait, maxWait, leading, trailing}) {
+    return (...args) => {
+        const limit = (agGridRateLimits[key] ??= {timer: null, args: null, start: 0});
+        const now = Date.now();
+        const fire = () => {
+            if (limit.args === null) {
+                limit.timer = null;
+                return;
+            }
+            const pending = limit.args;
+            limit.args = null;
+            limit.start = Date.now();
+            // keep the burst open, so the next event is not sent as leading
+            limit.timer = setTimeout(fire, wait);
+            handler(...pending);
+        };
+        if (limit.timer === null) {
+            limit.start = now;
+            if (leading) {
+                handler(...args);
+            } else if (trailing) {
+                limit.args = args;
+            }
+        } else {
+            clearTimeout(limit.timer);
+            if (trailing) {
+                limit.args = args;
+            }
+        }
+        const delay = maxWait == null ? wait : Math.min(wait, Math.max(0, limit.start + maxWait - now));
+        limit.timer = setTimeout(fire, delay);
+    };
+}
+"""
+
+
+def _rate_limited(value: Any, key: str, limit: EventRateLimit) -> rx.Var:
+    """Wrap an event trigger value with the client-side rate limiter."""
+    handler = rx.vars.LiteralVar.create(value)
+    options = json.dumps(
+        {
+            "wait": limit.wait,
+            "maxWait": limit.max_wait,
+            "leading": limit.leading,
+            "trailing": limit.trailing,
+        }
+    )
+    return rx.Var(
+        _js_expr=f"agGridRateLimit({json.dumps(key)}, {handler}, {options})",
+        _var_type=rx.EventChain,
+        _var_data=handler._get_all_var_data(),
+    )
+
+
 size_columns_to_fit = rx.Var(
     "(event) => event.api.sizeColumnsToFit()", _var_type=rx.EventChain
 )
@@ -183,6 +348,14 @@ class ColumnDef(PropsBase):
     suppress_span_header_height: bool | None = None
     cell_renderer: rx.Var | None = None
     flex: int | rx.Var[int] | None = None
+    enable_row_group: bool | rx.Var[bool] | None = None
+    row_group: bool | rx.Var[bool] | None = None
+    row_group_index: int | rx.Var[int] | None = None
+    enable_value: bool | rx.Var[bool] | None = None
+    agg_func: str | rx.Var[str] | None = None
+    allowed_agg_funcs: list[str] | rx.Var[list[str]] | None = None
+    enable_pivot: bool | rx.Var[bool] | None = None
+    pivot: bool | rx.Var[bool] | None = None
 
 
 class ColumnGroup(PropsBase):
@@ -309,6 +482,9 @@ class AgGrid(rx.Component):
     # Variable to show row group panel
     row_group_panel_show: rx.Var[str] = rx.Var.create("never")
 
+    # Separator of the pivot keys and value column in server-side pivot result fields
+    server_side_pivot_result_field_separator: rx.Var[str]
+
     # Variable to suppress aggregate function in header
     suppress_agg_func_in_header: rx.Var[bool] = rx.Var.create(False)
 
@@ -408,6 +584,9 @@ class AgGrid(rx.Component):
     # Event handler for column pinned events
     on_column_pinned: rx.EventHandler[_on_column_event_spec]
 
+    # Event handler for column visibility change events
+    on_column_visible: rx.EventHandler[_on_column_event_spec]
+
     # Event handler for column header context menu events
     on_column_header_context_menu: rx.EventHandler[_on_column_event_spec]
 
@@ -438,8 +617,36 @@ class AgGrid(rx.Component):
         server_side_group_open_level: int | None = None,
         child_count_key: str | None = None,
         row_id_key: str | None = None,
+        selection_id_key: str | None = None,
+        event_rate_limits: dict[str, EventRateLimit | int] | None = None,
+        event_payloads: dict[str, list[str] | dict[str, str]] | None = None,
         **props,
     ) -> rx.Component:
+        """Create the grid.
+
+        Args:
+            *children: The children of the component, typically not used.
+            id: The id of the grid, used to access its api.
+            data_path_key: Key of the row data holding the tree data path.
+            is_server_side_group_key: Key of the row data telling it is a group.
+            get_server_side_group_key: Key of the row data holding the group key.
+            server_side_group_open_level: Open the groups up to this level.
+            child_count_key: Key of the row data holding the number of children.
+            row_id_key: Key of the row data identifying the row.
+            selection_id_key: Send only the row ids to on_selection_changed.
+            event_rate_limits: Event trigger name (e.g. "on_cell_mouse_over")
+                to its EventRateLimit, or to a throttle interval in ms. The
+                high-frequency mouse, focus and column events otherwise send
+                every occurrence to the backend.
+            event_payloads: Event trigger name to the fields sent to its handler
+                as a single dict, instead of the whole serializable event (which
+                includes the full row data), e.g.
+                {"on_cell_clicked": ["rowIndex", "colId", "rowId"]}.
+            **props: The props of the grid.
+
+        Returns:
+            The grid component.
+        """
         props.setdefault("id", id)
 
         # handle hierarchical data
@@ -473,6 +680,20 @@ class AgGrid(rx.Component):
                 rx.EventChain
             )
 
+        # send only the ids of the selected rows to on_selection_changed
+        if selection_id_key is not None and "on_selection_changed" in props:
+            props["on_selection_changed"] = _event_chain(
+                props["on_selection_changed"],
+                _on_selection_change_ids_signature(selection_id_key),
+            )
+
+        # extract only the declared fields of the event on the client
+        for trigger, fields in (event_payloads or {}).items():
+            if trigger in props:
+                props[trigger] = _event_chain(
+                    props[trigger], _projected_event_spec(fields)
+                )
+
         props["class_name"] = rx.match(
             props.get("theme", "quartz"),
             ("quartz", rx.color_mode_cond("ag-theme-quartz", "ag-theme-quartz-dark")),
@@ -488,7 +709,16 @@ class AgGrid(rx.Component):
         if "auto_size_strategy" in props:
             props["on_grid_ready"] = size_columns_to_fit
 
-        return super().create(*children, **props)
+        grid = super().create(*children, **props)
+        for trigger, limit in (event_rate_limits or {}).items():
+            if trigger not in grid.event_triggers:
+                continue
+            if not isinstance(limit, EventRateLimit):
+                limit = EventRateLimit.throttle(limit)
+            grid.event_triggers[trigger] = _rate_limited(
+                grid.event_triggers[trigger], f"{id}.{trigger}", limit
+            )
+        return grid
 
     def add_imports(self):
         return {
@@ -509,8 +739,11 @@ class AgGrid(rx.Component):
     def add_custom_code(self) -> list[str]:
         ag_grid_license_key = os.getenv("AG_GRID_LICENSE_KEY")
         if ag_grid_license_key is not None:
-            return [f"LicenseManager.setLicenseKey('{ag_grid_license_key}');"]
-        return ["LicenseManager.setLicenseKey(null);"]
+            return [
+                f"LicenseManager.setLicenseKey('{ag_grid_license_key}');",
+                _RATE_LIMIT_JS,
+            ]
+        return ["LicenseManager.setLicenseKey(null);", _RATE_LIMIT_JS]
 
     @property
     def api(self) -> AgGridAPI:
@@ -519,6 +752,26 @@ class AgGrid(rx.Component):
     def get_selected_rows(self, callback: rx.EventHandler) -> rx.event.EventSpec:
         return self.api.getSelectedRows(callback=callback)
 
+    def get_view(self, callback: rx.event.EventType) -> rx.event.EventSpec:
+        """Get the filter model, sort model and displayed column ids of the grid.
+
+        Args:
+            callback: Receives {filter_model, sort_model, columns}.
+
+        Returns:
+            The event specification.
+        """
+        script = f"""
+let api = {self.api._api};
+const sort_model = api.getColumnState()
+    .filter((column) => column.sort)
+    .sort((a, b) => a.sortIndex - b.sortIndex)
+    .map((column) => ({{colId: column.colId, sort: column.sort}}));
+const columns = api.getAllDisplayedColumns().map((column) => column.getColId());
+({{filter_model: api.getFilterModel(), sort_model: sort_model, columns: columns}})
+"""
+        return rx.call_script(script, callback=callback)
+
     def select_all(self) -> rx.event.EventSpec:
         return self.api.selectAll()
 
@@ -541,6 +794,87 @@ api.setNodesSelected({{ nodes: selected_nodes, newValue: true }});
 """
         return rx.call_script(script)  # type: ignore
 
+    def update_rows(
+        self, rows: list[dict[str, Any]], row_id_key: str = "id"
+    ) -> rx.event.EventSpec:
+        """Replace the data of the loaded rows matching the given rows by id.
+
+        Only the matching row nodes are redrawn, the row model cache is kept.
+
+        Args:
+            rows: The new row data.
+            row_id_key: The key identifying the rows.
+
+        Returns:
+            The event specification.
+        """
+        rows_var = rx.Var.create(rows)
+        script = f"""
+let api = {self.api._api};
+const rows = new Map({rows_var}.map((row) => [row.{row_id_key}, row]));
+api.forEachNode(function (node) {{
+    const row = node.data && rows.get(node.data.{row_id_key});
+    if (row !== undefined) {{
+        node.setData(row);
+    }}
+}});
+"""
+        return rx.call_script(script)
+
+    def apply_row_changes(
+        self,
+        added: list[dict[str, Any]],
+        updated: list[dict[str, Any]],
+        removed: list[Any],
+        row_id_key: str = "id",
+    ) -> rx.event.EventSpec:
+        """Apply row changes made elsewhere to the rows shown by the grid.
+
+        The server-side row model applies them as a transaction, unless rows
+        are grouped or pivoted, or added rows may not match the filter, in which
+        case it refreshes. The infinite row model updates the loaded rows in
+        place, and refreshes its cache when rows are added or removed.
+
+        Args:
+            added: The data of the added rows.
+            updated: The new data of the updated rows.
+            removed: The ids of the removed rows.
+            row_id_key: The key identifying the rows.
+
+        Returns:
+            The event specification.
+        """
+        changes_var = rx.Var.create(
+            {"added": added, "updated": updated, "removed": removed}
+        )
+        script = f"""
+let api = {self.api._api};
+const {{added, updated, removed}} = {changes_var};
+if (api.getGridOption("rowModelType") === "serverSide") {{
+    const filtered = Object.keys(api.getFilterModel() ?? {{}}).length > 0;
+    if (api.getRowGroupColumns().length || api.isPivotMode() || (added.length && filtered)) {{
+        api.refreshServerSide({{purge: false}});
+    }} else {{
+        api.applyServerSideTransactionAsync({{
+            add: added,
+            update: updated,
+            remove: removed.map((id) => ({{{row_id_key}: id}})),
+        }});
+    }}
+}} else if (added.length || removed.length) {{
+    api.refreshInfiniteCache();
+}} else {{
+    const rows = new Map(updated.map((row) => [row.{row_id_key}, row]));
+    api.forEachNode(function (node) {{
+        const row = node.data && rows.get(node.data.{row_id_key});
+        if (row !== undefined) {{
+            node.setData(row);
+        }}
+    }});
+}}
+"""
+        return rx.call_script(script)
+
     def log_nodes(self) -> rx.event.EventSpec:
         return rx.call_script(
             f"""
@@ -555,16 +889,16 @@ api.forEachNode(function (node) {{
     def setGridOption(self, key: str, value: rx.Var) -> rx.event.EventSpec:  # noqa: N802
         return self.api.set_grid_option(key, value)
 
-    def set_datasource(self, datasource: Datasource):
+    def set_datasource(self, datasource: Datasource | rx.Var):
         return self.setGridOption(
             key="datasource",
             value=rx.Var.create(datasource),
         )
 
-    def set_serverside_datasource(self, datasource: SSRMDatasource):
+    def set_serverside_datasource(self, datasource: SSRMDatasource | rx.Var):
         return self.setGridOption(
             key="serverSideDatasource",
-            value=rx.Var.create(datasource, _var_is_string=False),
+            value=rx.Var.create(datasource),
         )
 
     def show_loading_overlay(self) -> rx.event.EventSpec:
@@ -580,7 +914,11 @@ api.forEachNode(function (node) {{
         return self.api.redrawRows()
 
     def export_data_as_csv(self) -> rx.event.EventSpec:
-        """Export the grid data as a CSV file."""
+        """Export the grid data as a CSV file.
+
+        Only the rows loaded in the browser are exported with the infinite and
+        server-side row models, the wrappers export every row from the server.
+        """
         return self.api.exportDataAsCsv()
 
 
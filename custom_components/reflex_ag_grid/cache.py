@@ -0,0 +1,215 @@
+"""Server-side caches for ag-grid data served by the wrappers."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple
+
+# Every live cache, so that writes can invalidate entries wherever they are.
+_caches: weakref.WeakSet[BlockCache] = weakref.WeakSet()
+
+
+def estimate_size(value: Any) -> int:
+    """Roughly estimate the memory used by a cached value in bytes.
+
+    Lists, tuples and dicts are walked one level deep, model instances are
+    measured by their field values. This is not exact, but it is cheap and
+    proportional to the real footprint, which is all the cache limits need.
+
+    Args:
+        value: The value to measure.
+
+    Returns:
+        The estimated size in bytes.
+    """
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items()
+        )
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(v) for k, v in vars(value).items() if not k.startswith("_sa_")
+        )
+    return sys.getsizeof(value)
+
+
+class _Entry(NamedTuple):
+    value: Any
+    tag: Hashable
+    size: int
+    expires_at: float | None
+
+
+class BlockCache:
+    """Bounded LRU cache with per-entry TTL and tag based invalidation.
+
+    Entries are evicted least recently used first whenever either the entry
+    count or the estimated memory footprint exceeds its limit.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float | None = 60.0,
+    ):
+        """Create a cache.
+
+        Args:
+            max_entries: The maximum number of entries to keep.
+            max_bytes: The maximum estimated size of all entries in bytes.
+            ttl: Seconds an entry stays valid, or None to keep entries until evicted.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and (
+            entry.expires_at is None or entry.expires_at > time.monotonic()
+        )
+
+    def _pop(self, key: Hashable) -> _Entry:
+        entry = self._entries.pop(key)
+        self.size_bytes -= entry.size
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, counting the hit or miss.
+
+        Args:
+            key: The cache key.
+            default: The value to return on a miss.
+
+        Returns:
+            The cached value, or default if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry.expires_at is not None and entry.expires_at <= time.monotonic()
+            ):
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a cached value and return it, so that it is used only once.
+
+        Args:
+            key: The cache key.
+            default: The value to return if missing or expired.
+
+        Returns:
+            The cached value, or default if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._pop(key)
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                return default
+            return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tag: Hashable = None,
+        size: int | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        """Store a value in the cache.
+
+        Args:
+            key: The cache key.
+            value: The value to cache.
+            tag: Entries sharing a tag can be invalidated together.
+            size: The size of the value in bytes, estimated when not given.
+            ttl: Override the cache ttl for this entry.
+        """
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = _Entry(value, tag, size, expires_at)
+            self.size_bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self.size_bytes > self.max_bytes
+            ):
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tag: Hashable) -> int:
+        """Drop every entry stored with the given tag.
+
+        Args:
+            tag: The tag to invalidate.
+
+        Returns:
+            The number of entries dropped.
+        """
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.tag == tag]
+            for key in keys:
+                self._pop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop every entry in the cache."""
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Get the cache counters.
+
+        Returns:
+            The hit, miss and eviction counts and the current entries and size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+        }
+
+
+def invalidate_tag(tag: Hashable) -> None:
+    """Drop the entries with the given tag from every cache.
+
+    Args:
+        tag: The tag to invalidate, for the wrappers this is the model class.
+    """
+    for cache in list(_caches):
+        cache.invalidate(tag)
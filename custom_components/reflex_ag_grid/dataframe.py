@@ -0,0 +1,127 @@
+"""ag-grid pandas/polars DataFrame wrapper."""
+
+from __future__ import annotations
+
+import datetime
+import json
+from typing import Any, ClassVar, Type
+
+import numpy as np
+import reflex as rx
+
+from reflex_ag_grid.ag_grid import ColumnDef
+from reflex_ag_grid.cache import BlockCache, invalidate_tag
+from reflex_ag_grid.vectorized import _null_mask, filter_sort_indices
+from reflex_ag_grid.wrapper import AbstractWrapper, get_default_column_def
+
+
+def _column_type(values: np.ndarray) -> Type:
+    kind = values.dtype.kind
+    if kind == "b":
+        return bool
+    if kind in "iu":
+        return int
+    if kind == "f":
+        return float
+    if kind == "M":
+        return datetime.datetime
+    return str
+
+
+def _to_python(values: np.ndarray) -> list[Any]:
+    """Convert a column slice to JSON serializable python values, nulls to None."""
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[us]").tolist()
+    null = _null_mask(values)
+    if null.any():
+        return np.where(null, None, values).tolist()
+    return values.tolist()
+
+
+class DataFrameWrapper(AbstractWrapper):
+    """Ag-Grid wrapper serving a pandas or polars DataFrame held on the server.
+
+    The DataFrame is never stored in the state or sent to the browser, the
+    grid fetches the visible blocks from the infinite row model data route,
+    filtered and sorted with the vectorized handlers.
+    """
+
+    _dataframe: ClassVar[Any] = None
+    _columns: ClassVar[dict[str, np.ndarray]] = {}
+    _length: ClassVar[int] = 0
+    # Row order of each (filter_model, sort_model) view.
+    _indices_cache: ClassVar[BlockCache] = BlockCache(max_entries=32, ttl=300.0)
+    __data_row_count__ = True
+
+    @classmethod
+    def set_dataframe(cls, dataframe: Any):
+        """Set (or replace) the DataFrame served by this wrapper.
+
+        Args:
+            dataframe: A pandas or polars DataFrame.
+        """
+        cls._dataframe = dataframe
+        cls._columns = {
+            str(column): np.asarray(dataframe[column].to_numpy())
+            for column in dataframe.columns
+        }
+        cls._length = len(dataframe)
+        invalidate_tag(cls._cache_tag())
+        # the column defs follow the columns of the DataFrame
+        cls._invalidate_grid_setup()
+
+    def _get_column_defs(self) -> list[ColumnDef]:
+        return [
+            get_default_column_def(field=field, ftype=_column_type(values))
+            for field, values in self._columns.items()
+        ]
+
+    def _get_indices(
+        self,
+        filter_model: dict[str, Any] | None,
+        sort_model: list[dict[str, str]] | None,
+    ) -> np.ndarray:
+        """Get the row indices of the filtered and sorted view, cached."""
+        key = (
+            type(self),
+            json.dumps(filter_model or {}, sort_keys=True),
+            json.dumps(sort_model or []),
+        )
+        indices = self._indices_cache.get(key)
+        if indices is None:
+            indices = filter_sort_indices(
+                self._columns, filter_model, sort_model, self._length
+            )
+            self._indices_cache.set(
+                key, indices, tag=self._cache_tag(), size=indices.nbytes
+            )
+        return indices
+
+    def _row_count(self, filter_model: dict[str, Any] | None = None) -> int:
+        if not filter_model:
+            return self._length
+        return len(self._get_indices(filter_model, None))
+
+    def _get_data(
+        self,
+        start: int,
+        end: int,
+        filter_model: dict[str, Any] | None = None,
+        sort_model: list[dict[str, str]] | None = None,
+    ) -> list[dict[str, Any]]:
+        indices = self._get_indices(filter_model, sort_model)[start:end]
+        fields = list(self._columns)
+        columns = [_to_python(self._columns[field][indices]) for field in fields]
+        return [
+            dict(zip(fields, values, strict=True))
+            for values in zip(*columns, strict=True)
+        ]
+
+    @classmethod
+    def create(cls, *children, dataframe: Any, **props) -> rx.Component:
+        comp = super().create(*children, **props)
+        comp.State.set_dataframe(dataframe)
+        return comp
+
+
+dataframe_wrapper = DataFrameWrapper.create
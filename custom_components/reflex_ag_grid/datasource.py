@@ -1,4 +1,7 @@
+from typing import Any, ClassVar
+
 import reflex as rx
+from fastapi.encoders import jsonable_encoder
 from reflex.base import Base
 from reflex.config import get_config
 from reflex.utils import format
@@ -6,12 +9,38 @@ from reflex.utils.imports import ImportVar
 from reflex.utils.serializers import serialize
 
 
+def encode_columns(rows: list[Any]) -> dict[str, list[Any]]:
+    """Encode a block of rows as column-oriented JSON.
+
+    Field names are sent once instead of once per row, the getRows function
+    of Datasource decodes the block back into row objects.
+
+    Args:
+        rows: The rows, as dicts or model instances.
+
+    Returns:
+        A dict with the list of "fields" and one list of values per field in "columns".
+    """
+    if not rows:
+        return {"fields": [], "columns": []}
+    if isinstance(rows[0], dict):
+        fields = list(dict.fromkeys(field for row in rows for field in row))
+        columns = [[row.get(field) for row in rows] for field in fields]
+    else:
+        fields = list(type(rows[0]).__fields__)
+        columns = [[getattr(row, field) for row in rows] for field in fields]
+    return {"fields": fields, "columns": jsonable_encoder(columns)}
+
+
 class Datasource(Base):
     uri: str | None = None
     endpoint_uri: str | None = None
     rowCount: rx.Var[int] | int | None = None  # noqa: N815
     getRows: rx.Var | None = None  # noqa: N815
 
+    # Number of fetched blocks kept in the browser to answer 304 responses.
+    _etag_cache_size: ClassVar[int] = 64
+
     def get_uri(self) -> str:
         return self.uri or (
             f"{self.endpoint_uri}?"
@@ -23,23 +52,56 @@ class Datasource(Base):
 
     def _get_rows_function(self) -> str | rx.Var:
         uri = f"getBackendURL(`{get_config().api_url}{self.get_uri()}`)"
-        js_func = (
-            """
-(params) => {
-    fetch(%s, {
-        headers: {"X-Reflex-Client-Token": token},
+        js_func = """
+((blocks) => (params) => {
+    const url = %s;
+    const cached = blocks.get(url);
+    const headers = {"X-Reflex-Client-Token": token};
+    if (cached !== undefined) {
+        headers["If-None-Match"] = cached.etag;
+    }
+    fetch(url, {headers: headers, cache: "no-store"})
+    .then((response) => {
+        if (response.status === 304 && cached !== undefined) {
+            return cached.data;
+        }
+        const etag = response.headers.get("ETag");
+        return response.json().then((data) => {
+            blocks.delete(url);
+            if (etag) {
+                blocks.set(url, {etag: etag, data: data});
+                if (blocks.size > %d) {
+                    blocks.delete(blocks.keys().next().value);
+                }
+            }
+            return data;
+        });
+    })
+    .then((data) => {
+        let rows = Array.isArray(data) ? data : data.rows;
+        if (!Array.isArray(rows)) {
+            const {fields, columns} = rows;
+            const length = columns.length ? columns[0].length : 0;
+            rows = new Array(length);
+            for (let ix = 0; ix < length; ix++) {
+                const row = {};
+                for (let jx = 0; jx < fields.length; jx++) {
+                    row[fields[jx]] = columns[jx][ix];
+                }
+                rows[ix] = row;
+            }
+        }
+        let lastRow = -1;
+        if (rows.length < params.endRow - params.startRow) {
+            lastRow = params.startRow + rows.length;
+        } else if (data.row_count !== undefined) {
+            lastRow = data.row_count > params.endRow ? data.row_count : params.endRow + 1;
+        }
+        params.successCallback(rows, lastRow);
     })
-    .then((response) => response.json()
-        .then((data) => params.successCallback(
-            data,
-            data.length < params.endRow - params.startRow ? params.startRow + data.length : -1,
-        ))
-    )
     .catch((error) => params.failCallback())
-}
-"""
-            % uri
-        )
+})(new Map())
+""" % (uri, self._etag_cache_size)
         return rx.Var.create_safe(
             js_func.replace("\n", ""),
             _var_is_local=False,
@@ -71,9 +133,8 @@ class Datasource(Base):
         Returns:
             The object as a Javascript Object literal.
         """
+        # dict() adds getRows
         d = self.dict(exclude={"uri"})
-        if self.getRows is None:
-            d["getRows"] = self._get_rows_function()
         return format.unwrap_vars(
             self.__config__.json_dumps(
                 {format.to_camel_case(key): value for key, value in d.items()},
@@ -133,6 +194,13 @@ class SSRMDatasource(Base):
             ),
         )
 
+    def dict(self, **kwargs):
+        d = super().dict(**kwargs)
+        d.pop("uri", None)
+        if self.getRows is None:
+            d["getRows"] = self._get_rows_function()
+        return d
+
     def json(self) -> str:
         """Convert the object to a json-like string.
 
@@ -143,9 +211,8 @@ class SSRMDatasource(Base):
         Returns:
             The object as a Javascript Object literal.
         """
+        # dict() adds getRows
         d = self.dict(exclude={"uri"})
-        if self.getRows is None:
-            d["getRows"] = self._get_rows_function()
         return format.unwrap_vars(
             self.__config__.json_dumps(
                 {format.to_camel_case(key): value for key, value in d.items()},
@@ -0,0 +1,229 @@
+"""Streaming encoders for server-side exports of the grid data."""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import datetime
+import io
+import tempfile
+from typing import Any, AsyncIterable, AsyncIterator, Callable
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Size of the chunks a spooled export file is streamed in.
+FILE_CHUNK_SIZE = 64 * 1024
+# Exports kept in memory up to this size before spilling to a temporary file.
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Chunks of rows, each row a list of values in the order of the columns.
+RowChunks = AsyncIterable[list[list[Any]]]
+# The python type of each column, None for the columns (or exports) without one.
+ColumnTypes = list[type | None] | None
+
+
+class _Drain(io.RawIOBase):
+    """Writable stream collecting the written bytes until they are drained."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def encode_csv(
+    columns: list[str], chunks: RowChunks, column_types: ColumnTypes = None
+) -> AsyncIterator[bytes]:
+    """Encode rows as CSV with a header row, one piece per chunk of rows.
+
+    Args:
+        columns: The column names.
+        chunks: The chunks of rows.
+        column_types: Unused, the values are written as text.
+
+    Yields:
+        The encoded CSV.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _xlsx_value(value: Any) -> Any:
+    # Excel has no time zones
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def _append_xlsx_rows(sheet: Any, rows: list[list[Any]]) -> None:
+    for row in rows:
+        sheet.append([_xlsx_value(value) for value in row])
+
+
+async def encode_xlsx(
+    columns: list[str], chunks: RowChunks, column_types: ColumnTypes = None
+) -> AsyncIterator[bytes]:
+    """Encode rows as an Excel workbook with a header row.
+
+    The workbook is written in openpyxl write-only mode, which keeps the rows
+    in a temporary file, and then streamed. A zip archive cannot be sent before
+    it is complete, so the first bytes arrive once every row has been read.
+
+    Args:
+        columns: The column names.
+        chunks: The chunks of rows.
+        column_types: Unused, the cells take the types of the values.
+
+    Yields:
+        The encoded workbook.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+    async for rows in chunks:
+        await asyncio.to_thread(_append_xlsx_rows, sheet, rows)
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as file:
+        await asyncio.to_thread(workbook.save, file)
+        file.seek(0)
+        while data := file.read(FILE_CHUNK_SIZE):
+            yield data
+
+
+def _parquet_type(python_type: type | None, values: list[Any]) -> Any:
+    arrow_type = {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        datetime.date: pa.date32(),
+    }.get(python_type)
+    if arrow_type is not None:
+        return arrow_type
+    # guess from the values, datetimes may or may not carry a time zone
+    arrow_type = pa.array(values).type
+    if not pa.types.is_null(arrow_type):
+        return arrow_type
+    return pa.timestamp("us") if python_type is datetime.datetime else pa.string()
+
+
+def _parquet_schema(
+    columns: list[str], rows: list[list[Any]], column_types: ColumnTypes
+) -> Any:
+    """Build the schema from the column types, or from the first chunk of rows.
+
+    Columns with neither a known type nor a value are strings.
+    """
+    return pa.schema(
+        [
+            pa.field(
+                column,
+                _parquet_type(
+                    column_types[index] if column_types else None,
+                    [row[index] for row in rows],
+                ),
+            )
+            for index, column in enumerate(columns)
+        ]
+    )
+
+
+def _parquet_table(schema: Any, rows: list[list[Any]]) -> Any:
+    arrays = []
+    for index, field in enumerate(schema):
+        values = [row[index] for row in rows]
+        if pa.types.is_string(field.type):
+            values = [None if value is None else str(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+async def encode_parquet(
+    columns: list[str], chunks: RowChunks, column_types: ColumnTypes = None
+) -> AsyncIterator[bytes]:
+    """Encode rows as a Parquet file, one row group per chunk of rows.
+
+    Args:
+        columns: The column names.
+        chunks: The chunks of rows.
+        column_types: The python type of each column, None where unknown. The
+            columns without one take the type of their values in the first
+            chunk, so a column starting with only nulls is written as text.
+
+    Yields:
+        The encoded Parquet file.
+    """
+    sink = _Drain()
+    writer = None
+    try:
+        async for rows in chunks:
+            if not rows:
+                continue
+            if writer is None:
+                writer = pq.ParquetWriter(
+                    sink, _parquet_schema(columns, rows, column_types)
+                )
+            writer.write_table(_parquet_table(writer.schema, rows))
+            yield sink.drain()
+        if writer is None:
+            writer = pq.ParquetWriter(sink, _parquet_schema(columns, [], column_types))
+        writer.close()
+        writer = None
+        yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+# format -> (encoder, media type, file extension)
+EXPORT_FORMATS: dict[
+    str,
+    tuple[
+        Callable[[list[str], RowChunks, ColumnTypes], AsyncIterator[bytes]], str, str
+    ],
+] = {
+    "csv": (encode_csv, "text/csv; charset=utf-8", "csv"),
+}
+if openpyxl is not None:
+    EXPORT_FORMATS["xlsx"] = (
+        encode_xlsx,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "xlsx",
+    )
+if pq is not None:
+    EXPORT_FORMATS["parquet"] = (
+        encode_parquet,
+        "application/vnd.apache.parquet",
+        "parquet",
+    )
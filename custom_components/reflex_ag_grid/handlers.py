@@ -1,98 +1,210 @@
 """Handlers for the reflex_ag_grid component."""
 
+import copy
 import datetime
-from typing import Any, Type, TypeVar
+import functools
+import json
+from typing import Any, Callable, Iterable, Type, TypeVar
 
 import reflex as rx
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 from sqlalchemy.sql.roles import WhereHavingRole
-from sqlmodel import and_, not_, or_
-from sqlmodel.sql.expression import SelectOfScalar
+from sqlmodel import and_, case, func, not_, or_, select
+from sqlmodel.sql.expression import Select, SelectOfScalar
 
 M = TypeVar("M", bound=rx.Model)
+P = TypeVar("P")
 
 
 def handle_text_filter(value, filter_def) -> bool:
+    return _compile_reused(compile_text_filter, filter_def)(value)
+
+
+def handle_number_filter(value, filter_def) -> bool:
+    return _compile_reused(compile_number_filter, filter_def)(value)
+
+
+def handle_filter_def(value, filter_def) -> bool:
+    return _compile_reused(compile_filter_def, filter_def)(value)
+
+
+def handle_filter_model(row, filter_model) -> bool:
+    if not filter_model:
+        return True
+    return _compile_reused(compile_filter_model, filter_model)(row)
+
+
+Predicate = Callable[[Any], bool]
+
+
+def _false_predicate(value) -> bool:
+    return False
+
+
+def compile_text_filter(filter_def) -> Predicate:
     type = filter_def.get("type", "contains")
     filter = filter_def.get("filter", "")
     if type == "contains":
-        return filter in value
+        return lambda value: filter in value
     if type == "notContains":
-        return filter not in value
+        return lambda value: filter not in value
     if type == "equals":
-        return value == filter
+        return lambda value: value == filter
     if type == "notEqual":
-        return value != filter
+        return lambda value: value != filter
     if type == "startsWith":
-        return value.startswith(filter)
+        return lambda value: value.startswith(filter)
     if type == "endsWith":
-        return value.endswith(filter)
+        return lambda value: value.endswith(filter)
     if type == "blank":
-        return not value
+        return lambda value: not value
     if type == "notBlank":
-        return bool(value)
+        return bool
     raise TypeError(f"type {type} does not exist")
 
 
-def handle_number_filter(value, filter_def) -> bool:
+def compile_number_filter(filter_def) -> Predicate:
     type = filter_def.get("type", "equals")
     filter = filter_def.get("filter")
     if type == "equals":
-        return value == filter
+        return lambda value: value == filter
     if type == "notEqual":
-        return value != filter
+        return lambda value: value != filter
     if type == "greaterThan":
-        return value > filter
+        return lambda value: value > filter
     if type == "greaterThanOrEqual":
-        return value >= filter
+        return lambda value: value >= filter
     if type == "lessThan":
-        return value < filter
+        return lambda value: value < filter
     if type == "lessThanOrEqual":
-        return value <= filter
+        return lambda value: value <= filter
     if type == "inRange":
-        return filter <= value <= filter_def.get("filterTo")
+        filter_to = filter_def.get("filterTo")
+        return lambda value: filter <= value <= filter_to
     if type == "blank":
-        return not value
+        return lambda value: not value
     if type == "notBlank":
-        return bool(value)
-
+        return bool
     raise TypeError(f"type {type} does not exist")
 
 
-def handle_filter_def(value, filter_def) -> bool:
+def compile_filter_def(filter_def) -> Predicate:
+    """Compile a column filter definition into a predicate on the cell value."""
     if not filter_def:
-        return True
+        return lambda value: True
     operator = filter_def.get("operator", "").lower()
-    if operator == "and":
-        return all(
-            handle_filter_def(value, sub_filter)
-            for sub_filter in filter_def.get("conditions", [])
-        )
-    elif operator == "or":
-        return any(
-            handle_filter_def(value, sub_filter)
+    if operator in ("and", "or"):
+        predicates = tuple(
+            compile_filter_def(sub_filter)
             for sub_filter in filter_def.get("conditions", [])
         )
+        if operator == "and":
+            return lambda value: all(predicate(value) for predicate in predicates)
+        return lambda value: any(predicate(value) for predicate in predicates)
     filter_type = filter_def.get("filterType", "text")
     if filter_type == "text":
-        return handle_text_filter(value, filter_def)
+        return compile_text_filter(filter_def)
     if filter_type == "number":
-        return handle_number_filter(value, filter_def)
-    return False
+        return compile_number_filter(filter_def)
+    return _false_predicate
 
 
-def handle_filter_model(row, filter_model) -> bool:
-    if not filter_model:
-        return True
-    field, filter_def = None, None
-    try:
+class CompiledFilter:
+    """An ag-grid filter model compiled into a reusable row predicate.
+
+    Rows that raise while being filtered (missing fields, mismatched types)
+    are excluded. Compiled filters are cached and shared by every session,
+    so they hold no state: filter_rows returns the number of excluded rows.
+    """
+
+    def __init__(self, filter_model: dict[str, dict[str, Any]]):
+        self.filter_model = filter_model
+        # number of invalid filter definitions, each matches no rows
+        self.invalid = 0
+        self.predicates: list[tuple[str, Predicate]] = []
         for field, filter_def in filter_model.items():
-            if not handle_filter_def(row[field], filter_def):
-                return False
-    except Exception as e:
-        print(f"Error filtering {field} of {row}: {e}")  # noqa: T201
-        return False
-    return True
+            if not filter_def:
+                continue
+            try:
+                predicate = compile_filter_def(filter_def)
+            except Exception:
+                self.invalid += 1
+                predicate = _false_predicate
+            self.predicates.append((field, predicate))
+
+    def __call__(self, row) -> bool:
+        try:
+            for field, predicate in self.predicates:
+                if not predicate(row[field]):
+                    return False
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def _filter_column(
+        rows: list, field: str, predicate: Predicate
+    ) -> tuple[list, int]:
+        try:
+            return [row for row in rows if predicate(row[field])], 0
+        except Exception:
+            pass
+        # slow path, so that only the bad rows are dropped and counted
+        kept = []
+        errors = 0
+        for row in rows:
+            try:
+                if predicate(row[field]):
+                    kept.append(row)
+            except Exception:  # noqa: PERF203
+                errors += 1
+        return kept, errors
+
+    def filter_rows(self, rows: Iterable) -> tuple[list, int]:
+        """Filter many rows, one column predicate at a time.
+
+        Args:
+            rows: The rows to filter.
+
+        Returns:
+            The matching rows, and the number of rows excluded because a
+            predicate raised on them.
+        """
+        rows = list(rows)
+        errors = 0
+        for field, predicate in self.predicates:
+            rows, column_errors = self._filter_column(rows, field, predicate)
+            errors += column_errors
+        return rows, errors
+
+
+def compile_filter_model(filter_model: dict[str, dict[str, Any]]) -> CompiledFilter:
+    """Compile a filter model, cached by its canonical JSON encoding."""
+    return _compile_filter_model(json.dumps(filter_model or {}, sort_keys=True))
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_filter_model(filter_model_json: str) -> CompiledFilter:
+    return CompiledFilter(json.loads(filter_model_json))
+
+
+# compile function -> (definition, snapshot of it, result) of its last handle_* call
+_last_compiled: dict[Callable[[Any], Any], tuple[Any, Any, Any]] = {}
+
+
+def _compile_reused(compile_fn: Callable[[Any], P], definition: Any) -> P:
+    """Compile a definition once for a loop calling a handle_* function per value.
+
+    The definition of the previous call is recognized by identity, and the
+    snapshot catches it being modified in place, so that the values of one
+    loop reuse one compiled predicate.
+    """
+    last = _last_compiled.get(compile_fn)
+    if last is not None and last[0] is definition and last[1] == definition:
+        return last[2]
+    compiled = compile_fn(definition)
+    _last_compiled[compile_fn] = (definition, copy.deepcopy(definition), compiled)
+    return compiled
 
 
 _sql_operations = {
@@ -100,6 +212,17 @@ _sql_operations = {
     "or": or_,
 }
 
+_sql_aggregates = {
+    "sum": func.sum,
+    "min": func.min,
+    "max": func.max,
+    "avg": func.avg,
+    "count": func.count,
+}
+
+# colId of the column ag-grid adds to display the row groups
+AUTO_GROUP_COL_ID = "ag-Grid-AutoColumn"
+
 
 def where_text_filter(
     value: InstrumentedAttribute, filter_def: dict[str, str]
@@ -210,3 +333,203 @@ def apply_sort_model(
             field.desc() if sort_spec["sort"] == "desc" else field.asc()
         )
     return query
+
+
+def _group_key_value(column: InstrumentedAttribute, key: Any) -> Any:
+    """Convert a group key from the grid back to the type of the column."""
+    if not isinstance(key, str):
+        return key
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return key
+    if python_type is bool:
+        return key == "true"
+    if python_type in (int, float):
+        return python_type(key)
+    if python_type is datetime.datetime:
+        return datetime.datetime.fromisoformat(key)
+    return key
+
+
+def where_group_keys(
+    model: Type[M], row_group_cols: list[dict[str, Any]], group_keys: list[Any]
+) -> list[WhereHavingRole]:
+    """Conditions selecting the rows under the given (partial) group path."""
+    conditions = []
+    for group_col, key in zip(row_group_cols, group_keys, strict=False):
+        column = getattr(model, group_col["field"])
+        conditions.append(column == _group_key_value(column, key))
+    return conditions
+
+
+def apply_row_group_model(
+    model: Type[M],
+    query: SelectOfScalar[M],
+    row_group_cols: list[dict[str, Any]],
+    group_keys: list[Any],
+    value_cols: list[dict[str, Any]],
+    sort_model: list[dict[str, str]],
+    child_count_key: str = "childCount",
+    pivot_cols: list[dict[str, Any]] | None = None,
+    pivot_keys: list[tuple[Any, ...]] | None = None,
+    pivot_field_separator: str = "_",
+) -> Select:
+    """Build the GROUP BY query for the next row group level of a SSRM request.
+
+    Each result row holds the group value under the group column field, the
+    aggregated value columns under their fields, and the number of rows in
+    the group under child_count_key. When every row group is expanded, the
+    query returns a single row aggregating all rows under the group keys.
+
+    When pivoting, each value column is aggregated once per pivot key instead,
+    over the rows matching that key, under the field from pivot_result_fields.
+
+    Args:
+        model: The model class being queried.
+        query: The filtered query, as returned by apply_filter_model.
+        row_group_cols: The ag-grid rowGroupCols of the request.
+        group_keys: The ag-grid groupKeys of the request, one per expanded level.
+        value_cols: The ag-grid valueCols of the request, the column grouped
+            at this level keeps its group key instead of an aggregate.
+        sort_model: The ag-grid sort model.
+        child_count_key: The label of the child count column.
+        pivot_cols: The ag-grid pivotCols of the request.
+        pivot_keys: The pivot keys to aggregate, as returned by pivot_keys_query.
+        pivot_field_separator: The grid serverSidePivotResultFieldSeparator.
+
+    Returns:
+        The group query.
+    """
+    group_col = group_field = None
+    columns = {}
+    if len(group_keys) < len(row_group_cols):
+        group_field = row_group_cols[len(group_keys)]["field"]
+        group_col = getattr(model, group_field)
+        columns[group_field] = group_col
+    for value_col in value_cols:
+        aggregate = _sql_aggregates.get(value_col.get("aggFunc") or "sum")
+        if aggregate is None:
+            continue
+        value = getattr(model, value_col["field"])
+        if not pivot_cols:
+            # the group rows need their key under the group field, for the row
+            # ids and the group keys of the next level
+            if value_col["field"] != group_field:
+                columns[value_col["field"]] = aggregate(value)
+            continue
+        for pivot_key in pivot_keys or []:
+            matches_key = and_(
+                *(
+                    getattr(model, pivot_col["field"]) == key
+                    for pivot_col, key in zip(pivot_cols, pivot_key, strict=True)
+                )
+            )
+            field = pivot_field_separator.join(
+                [*(str(key) for key in pivot_key), value_col["field"]]
+            )
+            # rows outside the key are NULL, which every aggregate skips
+            columns[field] = aggregate(case((matches_key, value)))
+    columns[child_count_key] = func.count()
+    group_query = select(*(column.label(label) for label, column in columns.items()))
+    if query.whereclause is not None:
+        group_query = group_query.where(query.whereclause)
+    group_query = group_query.where(
+        *where_group_keys(model, row_group_cols, group_keys)
+    )
+    if group_col is None:
+        return group_query
+    group_query = group_query.group_by(group_col)
+    for sort_spec in sort_model:
+        col_id = sort_spec["colId"]
+        column = columns.get(group_field if col_id == AUTO_GROUP_COL_ID else col_id)
+        if column is None:
+            continue
+        group_query = group_query.order_by(
+            column.desc() if sort_spec["sort"] == "desc" else column.asc()
+        )
+    # a total order is needed to page through the groups
+    return group_query.order_by(group_col)
+
+
+def pivot_keys_query(
+    model: Type[M],
+    query: SelectOfScalar[M],
+    pivot_cols: list[dict[str, Any]],
+    limit: int | None = None,
+) -> Select:
+    """Build the query for the distinct pivot keys of the filtered rows.
+
+    Args:
+        model: The model class being queried.
+        query: The filtered query, as returned by apply_filter_model.
+        pivot_cols: The ag-grid pivotCols of the request.
+        limit: The maximum number of keys to return.
+
+    Returns:
+        The query returning one row per pivot key, in key order.
+    """
+    columns = [getattr(model, pivot_col["field"]) for pivot_col in pivot_cols]
+    keys_query = select(*columns).distinct()
+    if query.whereclause is not None:
+        keys_query = keys_query.where(query.whereclause)
+    return keys_query.order_by(*columns).limit(limit)
+
+
+def pivot_result_fields(
+    pivot_keys: list[tuple[Any, ...]],
+    value_cols: list[dict[str, Any]],
+    pivot_field_separator: str = "_",
+) -> list[str]:
+    """Get the fields of the pivot result columns built by apply_row_group_model.
+
+    Args:
+        pivot_keys: The pivot keys, as returned by pivot_keys_query.
+        value_cols: The ag-grid valueCols of the request.
+        pivot_field_separator: The grid serverSidePivotResultFieldSeparator.
+
+    Returns:
+        The pivotResultFields for the grid, one per pivot key and value column.
+    """
+    return [
+        pivot_field_separator.join(
+            [*(str(key) for key in pivot_key), value_col["field"]]
+        )
+        for pivot_key in pivot_keys
+        for value_col in value_cols
+        if (value_col.get("aggFunc") or "sum") in _sql_aggregates
+    ]
+
+
+def keyset_sort_model(
+    model: Type[M], sort_model: list[dict[str, str]], key: str = "id"
+) -> list[dict[str, str]]:
+    """Drop unknown columns and append the unique key as a tiebreaker."""
+    sort_model = [
+        sort_spec
+        for sort_spec in sort_model
+        if getattr(model, sort_spec["colId"], None) is not None
+    ]
+    if not any(sort_spec["colId"] == key for sort_spec in sort_model):
+        sort_model.append({"colId": key, "sort": "asc"})
+    return sort_model
+
+
+def where_keyset(
+    model: Type[M], sort_model: list[dict[str, str]], last_key: tuple[Any, ...]
+) -> WhereHavingRole:
+    """Seek predicate matching the rows that sort after last_key.
+
+    The predicate never matches NULL, so the sorted columns must be NOT NULL.
+    """
+    fields = [getattr(model, sort_spec["colId"]) for sort_spec in sort_model]
+    clauses = []
+    for ix, sort_spec in enumerate(sort_model):
+        if sort_spec["sort"] == "desc":
+            seek = fields[ix] < last_key[ix]
+        else:
+            seek = fields[ix] > last_key[ix]
+        clauses.append(
+            and_(*(fields[jx] == last_key[jx] for jx in range(ix)), seek),
+        )
+    return or_(*clauses)
@@ -0,0 +1,110 @@
+"""Publish row changes to the grids watching a model."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Hashable, NamedTuple
+
+
+class RowChanges(NamedTuple):
+    """Row-level changes to a model, as pushed to the watching grids."""
+
+    added: tuple[dict[str, Any], ...] = ()
+    updated: tuple[dict[str, Any], ...] = ()
+    # Ids of the deleted rows.
+    removed: tuple[Any, ...] = ()
+    # The rows changed in a way the lists do not describe, reload the grid.
+    refresh: bool = False
+    # Client token of the session making the change, its grid is up to date.
+    origin: str | None = None
+
+
+# key -> {queue: event loop of the subscriber}
+_subscribers: dict[
+    Hashable, dict[asyncio.Queue[RowChanges], asyncio.AbstractEventLoop]
+] = {}
+
+
+def subscribe(key: Hashable) -> asyncio.Queue[RowChanges]:
+    """Start receiving the changes published for the key.
+
+    Args:
+        key: What to watch, for the wrappers this is the model class.
+
+    Returns:
+        The queue the changes are put in.
+    """
+    queue: asyncio.Queue[RowChanges] = asyncio.Queue()
+    _subscribers.setdefault(key, {})[queue] = asyncio.get_running_loop()
+    return queue
+
+
+def unsubscribe(key: Hashable, queue: asyncio.Queue[RowChanges]) -> None:
+    """Stop putting the changes published for the key in the queue.
+
+    Args:
+        key: The watched key.
+        queue: The queue returned by subscribe.
+    """
+    queues = _subscribers.get(key, {})
+    queues.pop(queue, None)
+    if not queues:
+        _subscribers.pop(key, None)
+
+
+def publish(key: Hashable, changes: RowChanges) -> int:
+    """Send changes to every subscriber of the key.
+
+    Safe to call from any thread.
+
+    Args:
+        key: The changed key.
+        changes: The changes.
+
+    Returns:
+        The number of subscribers.
+    """
+    delivered = 0
+    for queue, loop in list(_subscribers.get(key, {}).items()):
+        if loop.is_closed():
+            # the subscriber will never unsubscribe itself
+            unsubscribe(key, queue)
+            continue
+        loop.call_soon_threadsafe(queue.put_nowait, changes)
+        delivered += 1
+    return delivered
+
+
+def merge_changes(changes: list[RowChanges], row_id_key: str = "id") -> RowChanges:
+    """Combine queued changes into one, keeping the last state of each row.
+
+    Args:
+        changes: The changes, oldest first.
+        row_id_key: The key identifying the rows.
+
+    Returns:
+        The combined changes.
+    """
+    added: dict[Any, dict[str, Any]] = {}
+    updated: dict[Any, dict[str, Any]] = {}
+    removed: dict[Any, None] = {}
+    refresh = False
+    for change in changes:
+        refresh = refresh or change.refresh
+        for row in change.added:
+            added[row[row_id_key]] = row
+        for row in change.updated:
+            if row[row_id_key] in added:
+                added[row[row_id_key]] = row
+            else:
+                updated[row[row_id_key]] = row
+        for row_id in change.removed:
+            if added.pop(row_id, None) is None:
+                updated.pop(row_id, None)
+                removed[row_id] = None
+    return RowChanges(
+        added=tuple(added.values()),
+        updated=tuple(updated.values()),
+        removed=tuple(removed),
+        refresh=refresh,
+    )
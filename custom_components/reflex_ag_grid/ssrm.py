@@ -0,0 +1,479 @@
+"""ag-grid rx.model wrapper for the server-side row model."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, ClassVar
+
+import reflex as rx
+from fastapi import Request
+from sqlmodel import func, select
+from sqlmodel.sql.expression import Select
+
+from reflex_ag_grid.ag_grid import ColumnDef
+from reflex_ag_grid.cache import BlockCache
+from reflex_ag_grid.datasource import SSRMDatasource
+from reflex_ag_grid.handlers import (
+    M,
+    apply_filter_model,
+    apply_row_group_model,
+    apply_sort_model,
+    pivot_keys_query,
+    pivot_result_fields,
+    where_group_keys,
+)
+from reflex_ag_grid.session import asession
+from reflex_ag_grid.wrapper import (
+    ModelWrapper,
+    ModelWrapperActionType,
+    get_default_column_def,
+)
+
+# Key of the number of rows under a group row.
+CHILD_COUNT_KEY = "childCount"
+# Unique row ids: the model id for leaf rows, the group key path for group rows.
+GET_ROW_ID = (
+    f"(params) => params.data.{CHILD_COUNT_KEY} === undefined ? String(params.data.id) : "
+    "JSON.stringify([...(params.parentKeys ?? []), params.data["
+    "params.api.getRowGroupColumns()[params.level]?.getColDef().field]])"
+)
+# Joins the pivot keys and the value column in pivot result fields, chosen so
+# that underscores in the keys do not split the pivot column groups.
+PIVOT_FIELD_SEPARATOR = "|"
+# Marks levels with too many groups to cache in the group cache.
+_LEVEL_TOO_LARGE = None
+_MISSING = object()
+
+
+class ModelSSRMWrapper(ModelWrapper[M]):
+    """Ag-Grid server-side row model wrapper for arbitrary rx.Model class.
+
+    Row grouping and aggregation run in the database: each level of groups is
+    one GROUP BY query over the filtered rows under the expanded group keys,
+    and only the leaf rows of an expanded group are fetched as model rows.
+
+    In pivot mode, the distinct keys of the pivot columns are fetched first,
+    and each value column is aggregated once per key with a conditional
+    aggregate, so the cost grows with the number of result cells.
+    """
+
+    __data_route__ = "/ssrm-model-wrapper-data"
+    __row_model_type__ = "serverSide"
+    __get_data_kwargs__ = {
+        "state": lambda cls: cls.get_full_name(),
+        "start": "${params.request.startRow}",
+        "end": "${params.request.endRow}",
+        "row_group_cols": "${encodeURIComponent(JSON.stringify(params.request.rowGroupCols))}",
+        "group_keys": "${encodeURIComponent(JSON.stringify(params.request.groupKeys))}",
+        "value_cols": "${encodeURIComponent(JSON.stringify(params.request.valueCols))}",
+        "pivot_mode": "${params.request.pivotMode}",
+        "pivot_cols": "${encodeURIComponent(JSON.stringify(params.request.pivotCols))}",
+        "sort_model": "${encodeURIComponent(JSON.stringify(params.request.sortModel))}",
+        "filter_model": "${encodeURIComponent(JSON.stringify(params.request.filterModel))}",
+    }
+    # The server-side row model always receives plain row objects and manages
+    # its own block cache, so __data_format__ and __data_prefetch__ do not apply.
+    # With __data_row_count__, full blocks also carry the number of rows at
+    # their level, otherwise the grid discovers it when a short block arrives.
+    __data_row_count__ = True
+
+    # Maximum number of pivot keys, further keys (in key order) are dropped.
+    _pivot_max_keys: ClassVar[int] = 100
+    # Cache of pivot keys per filter model, None disables caching.
+    _pivot_keys_cache: ClassVar[BlockCache | None] = BlockCache(
+        max_entries=256, ttl=30.0
+    )
+    # Cache of whole group levels (every group row of one GROUP BY query) per
+    # filter, sort, row groups, group keys and value columns, shared by all
+    # sessions and dropped on writes through the wrapper, None disables it.
+    _group_cache: ClassVar[BlockCache | None] = BlockCache(max_entries=1024, ttl=300.0)
+    # Levels with more groups than this are paged in the database instead.
+    _group_cache_max_rows: ClassVar[int] = 10_000
+
+    @classmethod
+    def _add_data_route(cls):
+        """Add the backend __data_route__ that responds to SSRM data requests."""
+        app = rx.utils.prerequisites.get_app().app
+        if any(route.path == cls.__data_route__ for route in app._api.routes):
+            return
+
+        @app._api.get(cls.__data_route__)
+        async def get_data(
+            request: Request,
+            state: str,
+            start: int,
+            end: int,
+            row_group_cols: str | None = None,
+            group_keys: str | None = None,
+            value_cols: str | None = None,
+            pivot_mode: bool = False,
+            pivot_cols: str | None = None,
+            filter_model: str | None = None,
+            sort_model: str | None = None,
+            columns: str | None = None,
+        ):
+            projection = {}
+            if columns is not None and columns != "null":
+                projection["columns"] = json.loads(columns)
+            return await cls._data_route_response(
+                app,
+                request,
+                state,
+                start=start,
+                end=end,
+                row_group_cols=json.loads(row_group_cols or "[]"),
+                group_keys=json.loads(group_keys or "[]"),
+                value_cols=json.loads(value_cols or "[]"),
+                pivot_mode=pivot_mode,
+                pivot_cols=json.loads(pivot_cols or "[]"),
+                filter_model=json.loads(filter_model or "{}"),
+                sort_model=json.loads(sort_model or "[]"),
+                **projection,
+            )
+
+    async def _get_data_response(self, **kwargs) -> dict[str, Any]:
+        """Call _get_data and wrap the rows for params.success.
+
+        Args:
+            **kwargs: Keyword arguments passed to _get_data.
+
+        Returns:
+            The rowData of the requested block, with the rowCount of its level
+            when it is known, and the pivotResultFields when pivoting.
+        """
+        rows = await self._get_block(**kwargs)
+        response = {"rowData": rows}
+        # without rows there is nothing to pivot, and a _get_data refusing the
+        # session must not reveal the pivot keys
+        if rows and kwargs["pivot_mode"] and kwargs["pivot_cols"]:
+            response["pivotResultFields"] = pivot_result_fields(
+                await self._pivot_keys(kwargs["filter_model"], kwargs["pivot_cols"]),
+                kwargs["value_cols"],
+                PIVOT_FIELD_SEPARATOR,
+            )
+        start, end = kwargs["start"], kwargs["end"]
+        level = _MISSING
+        if self._group_cache is not None:
+            level = self._group_cache.get(self._level_key(**kwargs), _MISSING)
+        if len(rows) < end - start:
+            response["rowCount"] = start + len(rows)
+        elif level not in (_MISSING, _LEVEL_TOO_LARGE):
+            response["rowCount"] = len(level)
+        elif self.__data_row_count__:
+            async with self._data_concurrency_limit():
+                row_count = await self._level_row_count(
+                    filter_model=kwargs["filter_model"],
+                    row_group_cols=kwargs["row_group_cols"],
+                    group_keys=kwargs["group_keys"],
+                    pivot_mode=kwargs["pivot_mode"],
+                )
+            # a cached count up to the end of a full block may be stale, the
+            # grid would never request the rows after it
+            if row_count > end:
+                response["rowCount"] = row_count
+        return response
+
+    @classmethod
+    def _refresh_data(cls) -> rx.event.EventSpec:
+        return cls._grid_component.api.refreshServerSide()
+
+    async def on_mount(self):
+        """Perform post-hydration grid initialization.
+
+        Set up column defs and the server-side data source.
+        """
+        setup = self._grid_setup()
+        return [
+            self._grid_component.api.set_grid_option(
+                "columnDefs", setup["column_defs"]
+            ),
+            self._grid_component.set_serverside_datasource(setup["datasource"]),
+        ]
+
+    def _get_datasource(self) -> SSRMDatasource:
+        return SSRMDatasource(uri=self._get_datasource_uri())
+
+    @classmethod
+    def _is_group_row(cls, row: dict[str, Any]) -> bool:
+        return CHILD_COUNT_KEY in row
+
+    def _get_column_defs(self) -> list[ColumnDef]:
+        return [
+            get_default_column_def(
+                field=field.name,
+                ftype=field.type_,
+                value_setter=type(self).on_value_setter,
+                editable=field.name != "id",
+                enable_row_group=field.name != "id",
+                enable_value=field.name != "id" and field.type_ in (int, float),
+                enable_pivot=field.name != "id",
+            )
+            for field in self._model_class.__fields__.values()
+        ]
+
+    def _level_query(
+        self,
+        filter_model: dict[str, Any],
+        sort_model: list[dict[str, str]],
+        row_group_cols: list[dict[str, Any]],
+        group_keys: list[Any],
+        value_cols: list[dict[str, Any]],
+        pivot_mode: bool = False,
+        pivot_cols: list[dict[str, Any]] | None = None,
+        pivot_keys: list[tuple[Any, ...]] | None = None,
+    ):
+        """Build the query for the rows at the level of the given group keys.
+
+        Args:
+            filter_model: The ag-grid filter model.
+            sort_model: The ag-grid sort model.
+            row_group_cols: The columns the rows are grouped by.
+            group_keys: The keys of the expanded groups above this level.
+            value_cols: The columns aggregated in the group rows.
+            pivot_mode: Whether the grid is in pivot mode.
+            pivot_cols: The columns the values are pivoted by.
+            pivot_keys: The pivot keys, from _pivot_keys.
+
+        Returns:
+            A GROUP BY query returning the group rows, or a query returning
+            the model rows under the innermost group. In pivot mode, the
+            innermost level is a single row aggregating its rows.
+        """
+        query = apply_filter_model(self._model_class, filter_model)
+        if pivot_mode or len(group_keys) < len(row_group_cols):
+            return apply_row_group_model(
+                model=self._model_class,
+                query=query,
+                row_group_cols=row_group_cols,
+                group_keys=group_keys,
+                value_cols=value_cols,
+                sort_model=sort_model,
+                child_count_key=CHILD_COUNT_KEY,
+                pivot_cols=pivot_cols if pivot_mode else None,
+                pivot_keys=pivot_keys,
+                pivot_field_separator=PIVOT_FIELD_SEPARATOR,
+            )
+        return apply_sort_model(
+            model=self._model_class,
+            query=query.where(
+                *where_group_keys(self._model_class, row_group_cols, group_keys)
+            ),
+            sort_model=sort_model,
+        )
+
+    def _level_key(
+        self,
+        filter_model: dict[str, Any],
+        sort_model: list[dict[str, str]],
+        row_group_cols: list[dict[str, Any]],
+        group_keys: list[Any],
+        value_cols: list[dict[str, Any]],
+        pivot_mode: bool = False,
+        pivot_cols: list[dict[str, Any]] | None = None,
+        **kwargs,
+    ) -> tuple:
+        """Identify the rows of one level, as seen through the request models."""
+        return (
+            self._model_class,
+            json.dumps(filter_model, sort_keys=True),
+            json.dumps(sort_model),
+            # deeper row groups do not change the rows of this level
+            json.dumps(row_group_cols[: len(group_keys) + 1]),
+            json.dumps(group_keys),
+            json.dumps(value_cols),
+            pivot_mode,
+            json.dumps(pivot_cols or []),
+        )
+
+    async def _get_group_level(
+        self, level_key: tuple, query: Select
+    ) -> list[dict[str, Any]] | None:
+        """Get every group row of a level from the group cache or the database.
+
+        Args:
+            level_key: The _level_key of the level.
+            query: The group query of the level.
+
+        Returns:
+            The group rows, or None if the level has more than
+            _group_cache_max_rows groups.
+        """
+        level = self._group_cache.get(level_key, _MISSING)
+        if level is not _MISSING:
+            return level
+        async with asession(self._async_db_url) as session:
+            result = await session.execute(query.limit(self._group_cache_max_rows + 1))
+            level = [dict(row._mapping) for row in result.all()]
+        if len(level) > self._group_cache_max_rows:
+            level = _LEVEL_TOO_LARGE
+        self._group_cache.set(level_key, level, tag=self._cache_tag())
+        return level
+
+    async def _pivot_keys(
+        self, filter_model: dict[str, Any], pivot_cols: list[dict[str, Any]]
+    ) -> list[tuple[Any, ...]]:
+        """Get the distinct pivot keys of the filtered rows, cached.
+
+        Args:
+            filter_model: The ag-grid filter model.
+            pivot_cols: The columns the values are pivoted by.
+
+        Returns:
+            Up to _pivot_max_keys keys, one value per pivot column, in key order.
+        """
+        if not await self._is_authorized(ModelWrapperActionType.SELECT, None):
+            return []
+        cache_key = (
+            self._model_class,
+            json.dumps(filter_model, sort_keys=True),
+            json.dumps([pivot_col["field"] for pivot_col in pivot_cols]),
+        )
+        if self._pivot_keys_cache is not None:
+            pivot_keys = self._pivot_keys_cache.get(cache_key)
+            if pivot_keys is not None:
+                return pivot_keys
+        query = pivot_keys_query(
+            self._model_class,
+            apply_filter_model(self._model_class, filter_model),
+            pivot_cols,
+            limit=self._pivot_max_keys,
+        )
+        async with asession(self._async_db_url) as session:
+            pivot_keys = [tuple(row) for row in (await session.execute(query)).all()]
+        if self._pivot_keys_cache is not None:
+            self._pivot_keys_cache.set(cache_key, pivot_keys, tag=self._cache_tag())
+        return pivot_keys
+
+    async def _level_row_count(
+        self,
+        filter_model: dict[str, Any],
+        row_group_cols: list[dict[str, Any]],
+        group_keys: list[Any],
+        pivot_mode: bool = False,
+    ) -> int:
+        """Count the rows at the level of the given group keys, cached.
+
+        Args:
+            filter_model: The ag-grid filter model.
+            row_group_cols: The columns the rows are grouped by.
+            group_keys: The keys of the expanded groups above this level.
+            pivot_mode: Whether the grid is in pivot mode.
+
+        Returns:
+            The number of group rows, or of model rows under the innermost group.
+        """
+        if not await self._is_authorized(ModelWrapperActionType.SELECT, None):
+            return 0
+        cache_key = (
+            self._model_class,
+            json.dumps(filter_model, sort_keys=True),
+            json.dumps(row_group_cols[: len(group_keys) + 1]),
+            json.dumps(group_keys),
+            pivot_mode,
+        )
+        if self._row_count_cache is not None:
+            row_count = self._row_count_cache.get(cache_key)
+            if row_count is not None:
+                return row_count
+        query = self._level_query(
+            filter_model, [], row_group_cols, group_keys, [], pivot_mode=pivot_mode
+        )
+        async with asession(self._async_db_url) as session:
+            row_count = (
+                await session.exec(select(func.count()).select_from(query.subquery()))
+            ).one()
+        if self._row_count_cache is not None:
+            self._row_count_cache.set(cache_key, row_count, tag=self._cache_tag())
+        return row_count
+
+    async def _get_data(
+        self,
+        start: int,
+        end: int,
+        filter_model: dict[str, Any] | None = None,
+        sort_model: list[dict[str, str]] | None = None,
+        row_group_cols: list[dict[str, Any]] | None = None,
+        group_keys: list[Any] | None = None,
+        value_cols: list[dict[str, Any]] | None = None,
+        pivot_mode: bool = False,
+        pivot_cols: list[dict[str, Any]] | None = None,
+        columns: list[str] | None = None,
+    ) -> list[M | dict[str, Any]]:
+        if not await self._is_authorized(ModelWrapperActionType.SELECT, None):
+            return []
+        filter_model = filter_model or {}
+        sort_model = sort_model or []
+        row_group_cols = row_group_cols or []
+        group_keys = group_keys or []
+        value_cols = value_cols or []
+        pivot_cols = pivot_cols or []
+        level_key = self._level_key(
+            filter_model,
+            sort_model,
+            row_group_cols,
+            group_keys,
+            value_cols,
+            pivot_mode=pivot_mode,
+            pivot_cols=pivot_cols,
+        )
+        is_group_level = pivot_mode or len(group_keys) < len(row_group_cols)
+        # group rows hold the group key and aggregates only, leaf rows can be
+        # narrowed to the displayed columns
+        fields = None if is_group_level else self._projected_fields(columns, sort_model)
+        cache_key = None
+        if self._block_cache is not None:
+            cache_key = (*level_key, start, end, fields and tuple(fields))
+            rows = self._block_cache.get(cache_key)
+            if rows is not None:
+                return rows
+        pivot_keys = None
+        if pivot_mode and pivot_cols:
+            pivot_keys = await self._pivot_keys(filter_model, pivot_cols)
+        query = self._level_query(
+            filter_model,
+            sort_model,
+            row_group_cols,
+            group_keys,
+            value_cols,
+            pivot_mode=pivot_mode,
+            pivot_cols=pivot_cols,
+            pivot_keys=pivot_keys,
+        )
+        if is_group_level and self._group_cache is not None:
+            level = await self._get_group_level(level_key, query)
+            if level is not _LEVEL_TOO_LARGE:
+                return level[start:end]
+        if is_group_level:
+            async with asession(self._async_db_url) as session:
+                result = await session.execute(query.offset(start).limit(end - start))
+                rows = [dict(row._mapping) for row in result.all()]
+        else:
+            rows = await self._fetch_rows(
+                query.offset(start).limit(end - start), fields
+            )
+        if cache_key is not None:
+            self._block_cache.set(cache_key, rows, tag=self._cache_tag())
+        return rows
+
+    @classmethod
+    def get_component(cls, *children, **props) -> rx.Component:
+        """Return the Ag-Grid component linked to the wrapper state.
+
+        Args:
+            children: The children components passed to ag_grid, typically not used.
+            **props: Additional props for the ag_grid component.
+
+        Returns:
+            The Ag-Grid component.
+        """
+        props.setdefault("row_group_panel_show", "always")
+        props.setdefault("get_row_id", rx.Var(GET_ROW_ID).to(rx.EventChain))
+        props.setdefault(
+            "server_side_pivot_result_field_separator", PIVOT_FIELD_SEPARATOR
+        )
+        return super().get_component(
+            *children, child_count_key=CHILD_COUNT_KEY, **props
+        )
+
+
+model_ssrm_wrapper = ModelSSRMWrapper.create
@@ -0,0 +1,205 @@
+"""Vectorized NumPy handlers for the reflex_ag_grid component.
+
+These mirror the row-wise `handle_*` and the SQL `where_*` handlers, but
+evaluate the ag-grid filter and sort models over whole column arrays. Blank
+and null semantics follow the SQL handlers: null (None, NaN, NaT) never
+matches a comparison, except `notEqual`.
+
+Requires numpy, which is an optional dependency of reflex-ag-grid.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Any, Mapping
+
+import numpy as np
+
+Columns = Mapping[str, Any]
+
+
+def _is_null(value: Any) -> bool:
+    try:
+        return value is None or bool(value != value)
+    except TypeError:
+        # pandas.NA has no truth value
+        return True
+
+
+def _null_mask(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind == "f":
+        return np.isnan(values)
+    if values.dtype.kind in "mM":
+        return np.isnat(values)
+    if values.dtype.kind == "O":
+        try:
+            return np.equal(values, None) | np.not_equal(values, values)
+        except TypeError:
+            return np.fromiter(map(_is_null, values), dtype=bool, count=len(values))
+    return np.zeros(len(values), dtype=bool)
+
+
+def _as_text(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    if values.dtype.kind in "US":
+        return values, np.zeros(len(values), dtype=bool)
+    null = _null_mask(values)
+    return np.where(null, "", values).astype(str), null
+
+
+def _as_datetime(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind == "M":
+        return values
+    return np.where(_null_mask(values), None, values).astype("datetime64[us]")
+
+
+def _compare(values: np.ndarray, type: str, filter: Any, filter_to: Any) -> np.ndarray:
+    if type == "equals":
+        return values == filter
+    if type == "notEqual":
+        return values != filter
+    if type == "greaterThan":
+        return values > filter
+    if type == "greaterThanOrEqual":
+        return values >= filter
+    if type == "lessThan":
+        return values < filter
+    if type == "lessThanOrEqual":
+        return values <= filter
+    if type == "inRange":
+        return (values >= filter) & (values <= filter_to)
+    raise TypeError(f"type {type} does not exist")
+
+
+def mask_text_filter(values: np.ndarray, filter_def: dict[str, Any]) -> np.ndarray:
+    type = filter_def.get("type", "contains")
+    filter = filter_def.get("filter", "")
+    text, null = _as_text(np.asarray(values))
+    if type == "blank":
+        return null | (text == "")
+    if type == "notBlank":
+        return ~null & (text != "")
+    if type == "contains":
+        mask = np.char.find(text, filter) >= 0
+    elif type == "notContains":
+        mask = np.char.find(text, filter) < 0
+    elif type == "equals":
+        mask = text == filter
+    elif type == "notEqual":
+        return null | (text != filter)
+    elif type == "startsWith":
+        mask = np.char.startswith(text, filter)
+    elif type == "endsWith":
+        mask = np.char.endswith(text, filter)
+    else:
+        raise TypeError(f"type {type} does not exist")
+    return mask & ~null
+
+
+def mask_number_filter(values: np.ndarray, filter_def: dict[str, Any]) -> np.ndarray:
+    type = filter_def.get("type", "equals")
+    values = np.asarray(values)
+    if filter_def.get("filterType") == "date":
+        values = _as_datetime(values)
+        filter = np.datetime64(
+            datetime.datetime.fromisoformat(filter_def.get("dateFrom")), "us"
+        )
+        filter_to = None
+        if filter_def.get("dateTo"):
+            filter_to = np.datetime64(
+                datetime.datetime.fromisoformat(filter_def.get("dateTo")), "us"
+            )
+    else:
+        if values.dtype.kind == "O":
+            values = np.where(_null_mask(values), np.nan, values).astype(float)
+        filter = filter_def.get("filter", 0)
+        filter_to = filter_def.get("filterTo")
+    null = _null_mask(values)
+    if type == "blank":
+        return null
+    if type == "notBlank":
+        return ~null
+    if type == "notEqual":
+        return null | (values != filter)
+    return _compare(values, type, filter, filter_to) & ~null
+
+
+def mask_filter_def(values: np.ndarray, filter_def: dict[str, Any]) -> np.ndarray:
+    values = np.asarray(values)
+    if not filter_def:
+        return np.ones(len(values), dtype=bool)
+    operator = filter_def.get("operator", "").lower()
+    if operator in ("and", "or"):
+        # conditions inherit the filterType of the combined filter
+        filter_type = {"filterType": filter_def.get("filterType", "text")}
+        masks = [
+            mask_filter_def(values, filter_type | sub_filter)
+            for sub_filter in filter_def.get("conditions", [])
+        ]
+        if not masks:
+            return np.ones(len(values), dtype=bool)
+        reduce = np.logical_and if operator == "and" else np.logical_or
+        return reduce.reduce(masks)
+    filter_type = filter_def.get("filterType", "text")
+    if filter_type == "text":
+        return mask_text_filter(values, filter_def)
+    if filter_type in ("number", "date"):
+        return mask_number_filter(values, filter_def)
+    return np.zeros(len(values), dtype=bool)
+
+
+def mask_filter_model(
+    columns: Columns, filter_model: dict[str, dict[str, Any]], length: int
+) -> np.ndarray:
+    """Evaluate a filter model over the columns as a boolean row mask."""
+    mask = np.ones(length, dtype=bool)
+    for field, filter_def in (filter_model or {}).items():
+        if filter_def:
+            mask &= mask_filter_def(columns[field], filter_def)
+    return mask
+
+
+def _sort_keys(values: np.ndarray, descending: bool) -> list[np.ndarray]:
+    null = _null_mask(values)
+    if values.dtype.kind in "biu":
+        key = values.astype(np.int64)
+    elif values.dtype.kind == "f":
+        key = np.where(null, 0.0, values)
+    elif values.dtype.kind in "mM":
+        key = values.view("int64")
+    else:
+        # rank other values (strings, mixed objects) by their sorted order
+        key = np.unique(np.where(null, "", values).astype(str), return_inverse=True)[1]
+    if descending:
+        key = -key
+    if not null.any():
+        return [key]
+    # nulls sort first in ascending order and last in descending order
+    return [key, null if descending else ~null]
+
+
+def argsort_sort_model(
+    columns: Columns, sort_model: list[dict[str, str]], indices: np.ndarray
+) -> np.ndarray:
+    """Order row indices by the sort model, stable for equal keys."""
+    keys = []
+    for sort_spec in reversed(sort_model or []):
+        if sort_spec["colId"] not in columns:
+            continue
+        values = np.asarray(columns[sort_spec["colId"]])[indices]
+        keys.extend(_sort_keys(values, sort_spec["sort"] == "desc"))
+    if not keys:
+        return indices
+    if len(keys) == 1:
+        return indices[np.argsort(keys[0], kind="stable")]
+    return indices[np.lexsort(keys)]
+
+
+def filter_sort_indices(
+    columns: Columns,
+    filter_model: dict[str, dict[str, Any]] | None,
+    sort_model: list[dict[str, str]] | None,
+    length: int,
+) -> np.ndarray:
+    """Get the indices of the rows matching the filter model, in sort order."""
+    indices = np.flatnonzero(mask_filter_model(columns, filter_model or {}, length))
+    return argsort_sort_model(columns, sort_model or [], indices)
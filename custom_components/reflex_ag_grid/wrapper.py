@@ -2,18 +2,290 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import csv
 import datetime
 import enum
+import functools
+import gzip
+import hashlib
+import inspect
+import io
+import itertools
 import json
-from typing import Any, ClassVar, Generic, Type
+import secrets
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    ClassVar,
+    Generic,
+    Iterable,
+    Literal,
+    Type,
+)
 
 import reflex as rx
-from fastapi import Request
-from sqlmodel import col, func, select
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from reflex.config import get_config
+from sqlalchemy import bindparam
+from sqlalchemy.exc import CompileError, SQLAlchemyError
+from sqlmodel import Session, col, delete, func, insert, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select
 
 from reflex_ag_grid.ag_grid import ColumnDef, ag_grid
-from reflex_ag_grid.datasource import Datasource
-from reflex_ag_grid.handlers import M, apply_filter_model, apply_sort_model
+from reflex_ag_grid.cache import BlockCache, invalidate_tag
+from reflex_ag_grid.datasource import Datasource, encode_columns
+from reflex_ag_grid.export import EXPORT_FORMATS
+from reflex_ag_grid.handlers import (
+    M,
+    apply_filter_model,
+    apply_sort_model,
+    keyset_sort_model,
+    where_keyset,
+)
+from reflex_ag_grid.live import (
+    RowChanges,
+    merge_changes,
+    publish,
+    subscribe,
+    unsubscribe,
+)
+from reflex_ag_grid.session import SyncSessionAdapter, asession
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Maximum number of distinct (model, filter, sort) views to keep cursors for.
+KEYSET_CURSOR_VIEWS = 256
+# Maximum number of block cursors to keep per view.
+KEYSET_CURSORS_PER_VIEW = 4096
+
+# Refetch the rows when columns are shown, their fields were not fetched.
+_refetch_on_column_shown = rx.Var(
+    "(event) => { if (event.visible !== false) {"
+    " event.api.getGridOption('rowModelType') === 'serverSide'"
+    " ? event.api.refreshServerSide() : event.api.refreshInfiniteCache(); } }",
+    _var_type=rx.EventChain,
+)
+
+# Identifies the rows of a model class as seen through a filter and sort model.
+ViewKey = tuple[type, str, str]
+
+# view -> {row index: sort key of the previous row}
+_keyset_cursors: OrderedDict[ViewKey, dict[int, tuple[Any, ...]]] = OrderedDict()
+
+
+def _view_key(
+    model: Type[M], filter_model: dict[str, Any], sort_model: list[dict[str, str]]
+) -> ViewKey:
+    return (
+        model,
+        json.dumps(filter_model, sort_keys=True),
+        json.dumps(sort_model),
+    )
+
+
+def _get_keyset_cursor(view: ViewKey, start: int) -> tuple[Any, ...] | None:
+    cursors = _keyset_cursors.get(view)
+    if cursors is None:
+        return None
+    _keyset_cursors.move_to_end(view)
+    return cursors.get(start)
+
+
+def _set_keyset_cursor(view: ViewKey, start: int, key: tuple[Any, ...]) -> None:
+    cursors = _keyset_cursors.setdefault(view, {})
+    _keyset_cursors.move_to_end(view)
+    cursors[start] = key
+    if len(cursors) > KEYSET_CURSORS_PER_VIEW:
+        cursors.pop(next(iter(cursors)))
+    while len(_keyset_cursors) > KEYSET_CURSOR_VIEWS:
+        _keyset_cursors.popitem(last=False)
+
+
+def _invalidate_keyset_cursors(model: Type[M]) -> None:
+    for view in [view for view in _keyset_cursors if view[0] is model]:
+        del _keyset_cursors[view]
+
+
+def _row_changes(
+    added: Iterable[Any] = (),
+    updated: Iterable[Any] = (),
+    removed: Iterable[Any] = (),
+    refresh: bool = False,
+    origin: str | None = None,
+) -> RowChanges:
+    return RowChanges(
+        added=tuple(jsonable_encoder(list(added))),
+        updated=tuple(jsonable_encoder(list(updated))),
+        removed=tuple(removed),
+        refresh=refresh,
+        origin=origin,
+    )
+
+
+def publish_row_changes(
+    model: Type[M],
+    added: Iterable[M | dict[str, Any]] = (),
+    updated: Iterable[M | dict[str, Any]] = (),
+    removed: Iterable[Any] = (),
+    refresh: bool = False,
+) -> None:
+    """Push changes made to a model outside of the wrappers to the live grids.
+
+    The server-side caches of the model are invalidated, and every ModelWrapper
+    grid with _live_updates showing the model applies the changes without
+    re-querying the unchanged rows. Call it from the backend event loop after
+    the transaction is committed.
+
+    Args:
+        model: The changed model class.
+        added: The inserted rows.
+        updated: The updated rows, with all their fields.
+        removed: The ids of the deleted rows.
+        refresh: The change is not described by the rows (e.g. a bulk UPDATE),
+            the grids reload their data.
+    """
+    _invalidate_keyset_cursors(model)
+    invalidate_tag(model)
+    publish(model, _row_changes(added, updated, removed, refresh))
+
+
+# wrapper class -> serialized {column_defs, datasource} sent to its grids on mount
+_grid_setups: dict[type, dict[str, rx.Var]] = {}
+
+# wrapper class -> semaphore limiting its concurrent data requests
+_data_semaphores: dict[type, asyncio.Semaphore] = {}
+
+# (client token, state, filter_model, sort_model, start, end) -> block future
+_prefetch_buffer = BlockCache(max_entries=1024, ttl=10.0)
+# Strong references to pending prefetch tasks, so they are not collected early.
+_prefetch_tasks: set[asyncio.Task] = set()
+
+# export ticket -> (client token, state, format, grid view) of a started export
+_export_tickets = BlockCache(max_entries=1024, ttl=60.0)
+
+
+def _displayed_columns_param(cls: type[AbstractWrapper]) -> str:
+    """Sorted ids of the columns displayed by the grid, as a data request parameter.
+
+    The getRows params of the infinite row model carry no grid api, so the
+    api is looked up through the ref of the grid.
+    """
+    api = f"(params.api ?? {cls._grid_component.api._api})"
+    return (
+        f"${{encodeURIComponent(JSON.stringify({api}?.getAllDisplayedColumns()"
+        ".map((column) => column.getColId()).sort() ?? null))}"
+    )
+
+
+def _prefetch_done(task: asyncio.Task) -> None:
+    _prefetch_tasks.discard(task)
+    if not task.cancelled():
+        # retrieve the exception, a failed prefetch is refetched on request
+        task.exception()
+
+
+def _data_block_response(
+    request: Request, data: Any, compression_min_size: int | None = None
+) -> Response:
+    """Encode a data block response with an ETag and optional compression.
+
+    The ETag is a hash of the encoded block, so a client that already holds
+    the same block gets an empty 304 response instead of the full payload.
+
+    Args:
+        request: The incoming request.
+        data: The response data.
+        compression_min_size: Compress bodies of at least this many bytes
+            using brotli or gzip, as accepted by the client. None disables compression.
+
+    Returns:
+        The response.
+    """
+    body = json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    headers = {
+        "Cache-Control": "private, no-cache",
+        "Access-Control-Expose-Headers": "ETag",
+        "Vary": "Accept-Encoding",
+    }
+    if any(
+        tag.strip().strip('"').split("-")[0] == digest
+        for tag in request.headers.get("If-None-Match", "").split(",")
+    ):
+        return Response(status_code=304, headers={**headers, "ETag": f'"{digest}"'})
+    encoding = None
+    if compression_min_size is not None and len(body) >= compression_min_size:
+        accept_encoding = request.headers.get("Accept-Encoding", "")
+        if brotli is not None and "br" in accept_encoding:
+            body, encoding = brotli.compress(body, quality=4), "br"
+        elif "gzip" in accept_encoding:
+            body, encoding = gzip.compress(body, compresslevel=5), "gzip"
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        # strong ETags must differ between encodings of the same block
+        headers["ETag"] = f'"{digest}-{encoding}"'
+    else:
+        headers["ETag"] = f'"{digest}"'
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _estimate_row_count(session: Session, query: Select) -> int | None:
+    """Get the query planner's row estimate for the query.
+
+    Only PostgreSQL is supported, other backends return None so the caller can
+    fall back to an exact count.
+
+    Args:
+        session: The database session.
+        query: The query to estimate.
+
+    Returns:
+        The estimated number of rows, or None if no estimate is available.
+    """
+    dialect = session.get_bind().dialect
+    if dialect.name != "postgresql":
+        return None
+    # the bind values are rendered inline, as the placeholder style of the
+    # driver (pyformat for psycopg, $n for asyncpg) is unknown here
+    try:
+        compiled = query.compile(
+            dialect=dialect, compile_kwargs={"literal_binds": True}
+        )
+    except CompileError:
+        return None
+    plan = (
+        session.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+        .scalar()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _row_values(row: Any, columns: list[str]) -> list[Any]:
+    if isinstance(row, dict):
+        return [row.get(column) for column in columns]
+    return [getattr(row, column, None) for column in columns]
+
+
+def _python_type(column: Any) -> type | None:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
 
 
 def _value_setter_signature(
@@ -84,6 +356,7 @@ class AbstractWrapper(rx.ComponentState):
     _selected_items: list[Any] = []
 
     __data_route__ = "/abstract-wrapper-data"
+    __row_model_type__ = "infinite"
     __get_data_kwargs__ = {
         "state": lambda cls: cls.get_full_name(),
         "start": "${params.startRow}",
@@ -91,6 +364,44 @@ class AbstractWrapper(rx.ComponentState):
         "sort_model": "${encodeURIComponent(JSON.stringify(params.sortModel))}",
         "filter_model": "${encodeURIComponent(JSON.stringify(params.filterModel))}",
     }
+    # When True, the data route reads the state without taking the exclusive
+    # per-session lock and never writes it back, so concurrent block requests
+    # from the same client are served in parallel. Any changes made to the
+    # state inside _get_data are discarded in this mode.
+    __data_read_only__ = True
+    # When True, each data block response also carries the filtered row count
+    # from _row_count, so the grid knows the real last row up front.
+    __data_row_count__ = False
+    # Wire format of the data blocks: "rows" sends a list of row objects,
+    # "columns" sends the field names once along with one list per column,
+    # which is much smaller for wide grids.
+    __data_format__: ClassVar[Literal["rows", "columns"]] = "rows"
+    # Executor used to run synchronous _get_data/_row_count implementations off
+    # the event loop, None uses the loop's default thread pool. A process pool
+    # requires the state and the returned rows to be picklable.
+    __data_executor__: ClassVar[Executor | None] = None
+    # Maximum number of data requests served concurrently for this wrapper
+    # class, None for no limit.
+    __data_concurrency__: ClassVar[int | None] = None
+    # Compress data blocks of at least this many bytes with brotli (if
+    # installed) or gzip, None disables compression.
+    __data_compression_min_size__: ClassVar[int | None] = 1024
+    # Offsets of neighbouring blocks to fetch in the background after serving
+    # a block, for example (1,) for the next block or (1, -1) for both. The
+    # results are kept briefly per session and used when the grid asks for them.
+    __data_prefetch__: ClassVar[tuple[int, ...]] = ()
+    # When True, data requests carry the sorted ids of the displayed columns,
+    # passed to _get_data as `columns` so that it can fetch only those fields.
+    # Rows are refetched when hidden columns are shown.
+    __data_columns__: ClassVar[bool] = False
+    # Build and serialize the column defs and the datasource once per wrapper
+    # class instead of on every mount. Disable it when _get_column_defs depends
+    # on the state, or call _invalidate_grid_setup after changing them.
+    __memoize_grid_setup__: ClassVar[bool] = True
+    # Route streaming the exports started by start_export.
+    __export_route__ = "/abstract-wrapper-export"
+    # Number of rows read from the data source at a time while exporting.
+    __export_chunk_size__: ClassVar[int] = 5000
 
     @classmethod
     def _add_data_route(cls):
@@ -99,7 +410,7 @@ class AbstractWrapper(rx.ComponentState):
         The backend route will call the _get_data method to fetch the data.
         """
         app = rx.utils.prerequisites.get_app().app
-        if cls.__data_route__ in app._api.routes:
+        if any(route.path == cls.__data_route__ for route in app._api.routes):
             return
 
         @app._api.get(cls.__data_route__)
@@ -110,59 +421,349 @@ class AbstractWrapper(rx.ComponentState):
             end: int,
             filter_model: str | None = None,
             sort_model: str | None = None,
+            columns: str | None = None,
         ):
-            try:
-                token = request.headers["X-Reflex-Client-Token"]
-            except KeyError:
-                return []
             if filter_model is not None:
                 filter_model = json.loads(filter_model)
             if sort_model is not None:
                 sort_model = json.loads(sort_model)
-            state_cls = rx.State.get_class_substate(tuple(state.split(".")))
-            async with app.modify_state(
-                rx.state._substate_key(token, state_cls)
-            ) as state:
-                s_instance = await state.get_state(state_cls)
-                result = s_instance._get_data(
-                    start=start,
-                    end=end,
+            projection = {}
+            if columns is not None and columns != "null":
+                projection["columns"] = json.loads(columns)
+            return await cls._data_route_response(
+                app,
+                request,
+                state,
+                start=start,
+                end=end,
+                filter_model=filter_model,
+                sort_model=sort_model,
+                **projection,
+            )
+
+    @staticmethod
+    async def _data_route_response(
+        app: rx.App, request: Request, state: str, **get_data_kwargs
+    ) -> Response | list:
+        """Respond to a data request with the wrapper state's _get_data.
+
+        Args:
+            app: The reflex app.
+            request: The incoming request.
+            state: The full name of the wrapper state.
+            **get_data_kwargs: Keyword arguments passed to _get_data.
+
+        Returns:
+            The encoded data block, or an empty list without a client token.
+        """
+        try:
+            token = request.headers["X-Reflex-Client-Token"]
+        except KeyError:
+            return []
+        state_cls = rx.State.get_class_substate(tuple(state.split(".")))
+        if not state_cls.__data_columns__:
+            # _get_data overrides of such wrappers need not take the columns
+            get_data_kwargs.pop("columns", None)
+        substate_key = rx.state._substate_key(token, state_cls)
+        if state_cls.__data_read_only__:
+            root_state = await app.state_manager.get_state(substate_key)
+            s_instance = await root_state.get_state(state_cls)
+            data = await s_instance._get_data_response(**get_data_kwargs)
+        else:
+            async with app.modify_state(substate_key) as root_state:
+                s_instance = await root_state.get_state(state_cls)
+                data = await s_instance._get_data_response(**get_data_kwargs)
+        return _data_block_response(
+            request, data, state_cls.__data_compression_min_size__
+        )
+
+    @classmethod
+    def _add_export_route(cls):
+        """Add the backend __export_route__ that streams the started exports."""
+        app = rx.utils.prerequisites.get_app().app
+        if any(route.path == cls.__export_route__ for route in app._api.routes):
+            return
+
+        @app._api.get(cls.__export_route__)
+        async def export_data(ticket: str):
+            return await cls._export_route_response(app, ticket)
+
+    @staticmethod
+    async def _export_route_response(app: rx.App, ticket: str) -> Response:
+        """Stream the export of the wrapper state that issued the ticket.
+
+        Args:
+            app: The reflex app.
+            ticket: The ticket returned by start_export.
+
+        Returns:
+            The streamed file, or 404 for an unknown, expired or used ticket.
+        """
+        # tickets are single use, the download url cannot be replayed
+        export = _export_tickets.pop(ticket)
+        if export is None:
+            return Response(status_code=404)
+        token, state, export_format, view = export
+        state_cls = rx.State.get_class_substate(tuple(state.split(".")))
+        root_state = await app.state_manager.get_state(
+            rx.state._substate_key(token, state_cls)
+        )
+        s_instance = await root_state.get_state(state_cls)
+        columns = s_instance._export_columns(view.get("columns"))
+        encode, media_type, extension = EXPORT_FORMATS[export_format]
+        filename = f"{state_cls._export_filename()}.{extension}"
+        return StreamingResponse(
+            encode(
+                columns,
+                s_instance._export_rows(
+                    filter_model=view.get("filter_model") or {},
+                    sort_model=view.get("sort_model") or [],
+                    columns=columns,
+                ),
+                s_instance._export_column_types(columns),
+            ),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    async def _get_data_response(self, **kwargs) -> list[Any] | dict[str, Any]:
+        """Call _get_data (and _row_count), awaiting the results if needed.
+
+        Args:
+            **kwargs: Keyword arguments passed to _get_data.
+
+        Returns:
+            The data for the requested block encoded in __data_format__, along
+            with the row count if __data_row_count__ is set and the block is full.
+        """
+        response = {}
+        if self.__data_prefetch__:
+            rows = await self._get_block_prefetched(**kwargs)
+        else:
+            rows = await self._get_block(**kwargs)
+        # a short block already tells the grid where the rows end, and a
+        # _get_data refusing the session returns no rows, so it gets no count
+        if (
+            self.__data_row_count__
+            and rows
+            and len(rows) >= kwargs["end"] - kwargs["start"]
+            and self._row_count_filters()
+        ):
+            async with self._data_concurrency_limit():
+                response["row_count"] = await self._run_data_method(
+                    self._row_count, filter_model=kwargs.get("filter_model")
+                )
+        if self.__data_format__ == "columns":
+            rows = encode_columns(rows)
+        elif not response:
+            return rows
+        response["rows"] = rows
+        return response
+
+    @classmethod
+    def _row_count_filters(cls) -> bool:
+        """Check that _row_count takes the filter model.
+
+        Overrides written for the previous _row_count(self) count every row,
+        which would be wrong for a filtered view, so their count is not sent
+        with the data blocks.
+        """
+        parameters = inspect.signature(cls._row_count).parameters.values()
+        return any(
+            parameter.name == "filter_model"
+            or parameter.kind is inspect.Parameter.VAR_KEYWORD
+            for parameter in parameters
+        )
+
+    async def _get_block(self, **kwargs) -> list[Any]:
+        """Fetch one block with _get_data, within the concurrency limit."""
+        async with self._data_concurrency_limit():
+            return await self._run_data_method(self._get_data, **kwargs)
+
+    async def _get_block_prefetched(
+        self,
+        start: int,
+        end: int,
+        filter_model: dict[str, Any] | None = None,
+        sort_model: list[dict[str, str]] | None = None,
+        **projection: Any,
+    ) -> list[Any]:
+        """Fetch a block from the prefetch buffer and prefetch its neighbours.
+
+        Args:
+            start: The index of the first row in the block.
+            end: The index after the last row in the block.
+            filter_model: The ag-grid filter model.
+            sort_model: The ag-grid sort model.
+            **projection: The displayed columns, with __data_columns__.
+
+        Returns:
+            The rows in the block.
+        """
+        view = (
+            self.router.session.client_token,
+            self.get_full_name(),
+            json.dumps(filter_model, sort_keys=True),
+            json.dumps(sort_model),
+            json.dumps(projection.get("columns")),
+        )
+        task = _prefetch_buffer.get((*view, start, end))
+        if task is None or (
+            task.done() and (task.cancelled() or task.exception() is not None)
+        ):
+            rows = await self._get_block(
+                start=start,
+                end=end,
+                filter_model=filter_model,
+                sort_model=sort_model,
+                **projection,
+            )
+            # keep the served block too, so scrolling back is also a buffer hit
+            served = asyncio.get_running_loop().create_future()
+            served.set_result(rows)
+            _prefetch_buffer.set(
+                (*view, start, end), served, tag=self._cache_tag(), size=0
+            )
+        else:
+            rows = await task
+        block_size = end - start
+        for offset in self.__data_prefetch__:
+            if offset > 0 and len(rows) < block_size:
+                # there is no data past the end of this block
+                continue
+            block_start = start + offset * block_size
+            key = (*view, block_start, block_start + block_size)
+            if block_start < 0 or key in _prefetch_buffer:
+                continue
+            task = asyncio.create_task(
+                self._get_block(
+                    start=block_start,
+                    end=block_start + block_size,
                     filter_model=filter_model,
                     sort_model=sort_model,
+                    **projection,
                 )
-                if hasattr(result, "__await__"):
-                    result = await result
-                return result
+            )
+            _prefetch_tasks.add(task)
+            task.add_done_callback(_prefetch_done)
+            _prefetch_buffer.set(key, task, tag=self._cache_tag(), size=0)
+        return rows
+
+    @classmethod
+    def _cache_tag(cls) -> Any:
+        """Get the tag of server-side cache entries derived from this wrapper.
+
+        Returns:
+            The tag passed to invalidate_tag to drop these entries.
+        """
+        return cls
+
+    @classmethod
+    def _data_concurrency_limit(cls) -> contextlib.AbstractAsyncContextManager:
+        """Get a context limiting the concurrent data requests for this class."""
+        if cls.__data_concurrency__ is None:
+            return contextlib.nullcontext()
+        if cls not in _data_semaphores:
+            _data_semaphores[cls] = asyncio.Semaphore(cls.__data_concurrency__)
+        return _data_semaphores[cls]
+
+    async def _run_data_method(self, method: Callable[..., Any], **kwargs) -> Any:
+        """Call a data method without blocking the event loop.
+
+        Coroutine functions are awaited directly, synchronous implementations
+        run in __data_executor__.
+
+        Args:
+            method: The bound _get_data or _row_count method.
+            **kwargs: Keyword arguments passed to the method.
+
+        Returns:
+            The result of the method.
+        """
+        if inspect.iscoroutinefunction(method):
+            result = await method(**kwargs)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.__data_executor__, functools.partial(method, **kwargs)
+            )
+        # Overrides may return the un-awaited result of an async super() call.
+        if hasattr(result, "__await__"):
+            result = await result
+        return result
+
+    @classmethod
+    def _refresh_data(cls) -> rx.event.EventSpec:
+        """Get the event making the grid fetch its data blocks again."""
+        return cls._grid_component.api.refreshInfiniteCache()
+
+    @classmethod
+    def _refresh_rows(cls, rows: list[Any]) -> rx.event.EventSpec:
+        """Get the event replacing the given rows in the grid, matched by id."""
+        return cls._grid_component.update_rows(jsonable_encoder(rows))
 
     @classmethod
     def _get_datasource_uri(cls) -> str:
         """Get the uri for the ag-grid DataSource model."""
+        get_data_kwargs = dict(cls.__get_data_kwargs__)
+        if cls.__data_columns__:
+            get_data_kwargs.setdefault("columns", _displayed_columns_param)
         return (
             cls.__data_route__
             + "?"
             + "&".join(
                 f"{key}={value if not callable(value) else value(cls)}"
-                for key, value in cls.__get_data_kwargs__.items()
+                for key, value in get_data_kwargs.items()
             )
         )
 
-    def on_mount(self):
+    async def on_mount(self):
         """Perform post-hydration grid initialization.
 
         Set up column defs and data source to fetch infinite row data.
         """
+        row_count = await self._run_data_method(self._row_count)
+        setup = self._grid_setup()
         return [
             self._grid_component.api.set_grid_option(
-                "columnDefs", self._get_column_defs()
+                "columnDefs", setup["column_defs"]
             ),
             self._grid_component.set_datasource(
-                Datasource(
-                    uri=self._get_datasource_uri(),
-                    rowCount=self._row_count(),
+                rx.Var(
+                    f"{{...{setup['datasource']}, rowCount: {json.dumps(row_count)}}}"
                 ),
             ),
         ]
 
+    def _get_datasource(self) -> Datasource:
+        """Get the datasource of the grid, without the row count."""
+        return Datasource(uri=self._get_datasource_uri())
+
+    def _grid_setup(self) -> dict[str, rx.Var]:
+        """Get the serialized column defs and datasource sent to the grid on mount.
+
+        Returns:
+            The "column_defs" and "datasource" Vars, built once per wrapper
+            class with __memoize_grid_setup__.
+        """
+        cls = type(self)
+        setup = _grid_setups.get(cls) if cls.__memoize_grid_setup__ else None
+        if setup is None:
+            setup = {
+                "column_defs": rx.Var.create(self._get_column_defs()),
+                "datasource": rx.Var.create(self._get_datasource()),
+            }
+            if cls.__memoize_grid_setup__:
+                _grid_setups[cls] = setup
+        return setup
+
+    @classmethod
+    def _invalidate_grid_setup(cls):
+        """Rebuild the column defs and datasource of this class and its subclasses."""
+        for wrapper in [
+            wrapper for wrapper in _grid_setups if issubclass(wrapper, cls)
+        ]:
+            del _grid_setups[wrapper]
+
     def on_selection_changed(self, rows, source, type):
         """Handle selection changed event."""
         self._selected_items = rows
@@ -185,10 +786,117 @@ class AbstractWrapper(rx.ComponentState):
         """Get the data for the grid, must be overridden."""
         raise NotImplementedError("Handle fetching data from the model.")
 
-    def _row_count(self) -> int:
+    def _row_count(self, filter_model: dict[str, Any] | None = None) -> int:
         """Get the total row count for the grid, must be overridden."""
         raise NotImplementedError("Handle fetching row count.")
 
+    @classmethod
+    def _mount_handlers(cls) -> list[rx.event.EventHandler]:
+        """The event handlers triggered when the grid is mounted."""
+        return [cls.on_mount]
+
+    @classmethod
+    def _export_filename(cls) -> str:
+        """Get the name of the exported file, without extension."""
+        return "export"
+
+    def _export_columns(self, columns: list[str] | None) -> list[str]:
+        """Get the exported fields, in the order of the displayed columns.
+
+        Args:
+            columns: The ids of the displayed columns, None for every column.
+
+        Returns:
+            The fields of the column defs that are displayed.
+        """
+        fields = [cdef.field for cdef in self._get_column_defs() if cdef.field]
+        return [column for column in columns or () if column in fields] or fields
+
+    def _export_column_types(self, columns: list[str]) -> list[type | None] | None:
+        """Get the python type of each exported field, None if unknown.
+
+        Formats with typed columns (Parquet) otherwise guess the types from
+        the first chunk of rows.
+        """
+        return None
+
+    async def _export_rows(
+        self,
+        filter_model: dict[str, Any],
+        sort_model: list[dict[str, str]],
+        columns: list[str],
+    ) -> AsyncIterator[list[list[Any]]]:
+        """Read the rows to export from _get_data, __export_chunk_size__ at a time.
+
+        Args:
+            filter_model: The ag-grid filter model.
+            sort_model: The ag-grid sort model.
+            columns: The exported fields.
+
+        Yields:
+            Chunks of rows, as lists of values in the order of the columns.
+        """
+        start = 0
+        while True:
+            rows = await self._get_block(
+                start=start,
+                end=start + self.__export_chunk_size__,
+                filter_model=filter_model,
+                sort_model=sort_model,
+            )
+            yield [_row_values(row, columns) for row in rows]
+            if len(rows) < self.__export_chunk_size__:
+                return
+            start += len(rows)
+
+    def start_export(self, view: dict[str, Any], export_format: str):
+        """Download every row matching the grid view from __export_route__.
+
+        Unlike exporting from the grid, this includes the rows not loaded in
+        the browser. The rows are streamed, so exports of any size take
+        constant memory on both sides.
+
+        Args:
+            view: The filter model, sort model and displayed columns of the grid.
+            export_format: "csv", "xlsx" (requires openpyxl) or "parquet"
+                (requires pyarrow).
+        """
+        if export_format not in EXPORT_FORMATS:
+            return rx.toast.error(f"Export to {export_format} is not available.")
+        ticket = secrets.token_urlsafe()
+        _export_tickets.set(
+            ticket,
+            (
+                self.router.session.client_token,
+                self.get_full_name(),
+                export_format,
+                view,
+            ),
+            size=0,
+        )
+        url = json.dumps(
+            f"{get_config().api_url}{self.__export_route__}?ticket={ticket}"
+        )
+        return rx.call_script(
+            "const link = document.createElement('a');"
+            f"link.href = getBackendURL({url});"
+            "link.click();"
+        )
+
+    @classmethod
+    def export_data(cls, export_format: str = "csv") -> rx.event.EventSpec:
+        """Get the event exporting every row matching the grid's filter and sort.
+
+        Args:
+            export_format: The format passed to start_export.
+
+        Returns:
+            The event specification.
+        """
+        return cls._grid_component.get_view(
+            callback=lambda view: cls.start_export(view, export_format),
+        )
+
     @classmethod
     def get_component(cls, *children, **props) -> rx.Component:
         """Return the Ag-Grid component linked to the wrapper state.
@@ -210,11 +918,13 @@ class AbstractWrapper(rx.ComponentState):
             "cache_block_size": 50,
             "group_default_expanded": None,
         }
+        if cls.__data_columns__:
+            _props["on_column_visible"] = _refetch_on_column_shown
         _props.update(props)
         return ag_grid.root(
             *children,
-            row_model_type="infinite",
-            on_mount=cls.on_mount,
+            row_model_type=cls.__row_model_type__,
+            on_mount=cls._mount_handlers(),
             on_selection_changed=cls.on_selection_changed,
             **_props,
         )
@@ -236,6 +946,7 @@ class AbstractWrapper(rx.ComponentState):
         comp = super().create(*children, **props)
         comp.State._grid_component = comp
         comp.State._add_data_route()
+        comp.State._add_export_route()
         return comp
 
 
@@ -253,7 +964,49 @@ class ModelWrapper(AbstractWrapper, Generic[M]):
 
     _model_class: ClassVar[Type[M] | None] = None
     _selected_items: list[M] = []
+    # Page with seek predicates built from the last row of the previous block
+    # instead of OFFSET, so that deep blocks cost the same as the first block.
+    # Views sorted by a nullable column are still paged with OFFSET.
+    _keyset_pagination: ClassVar[bool] = False
+    # Cache of fetched blocks shared by all sessions, None disables caching.
+    _block_cache: ClassVar[BlockCache | None] = None
+    # Cache of row counts per filter model, None disables caching.
+    _row_count_cache: ClassVar[BlockCache | None] = BlockCache(
+        max_entries=256, ttl=30.0
+    )
+    # Use the database planner estimate instead of COUNT where supported.
+    _row_count_approximate: ClassVar[bool] = False
+    # Async database url (sqlite+aiosqlite://..., postgresql+asyncpg://...),
+    # defaults to `async_db_url` from rxconfig.py. Without one, the blocking
+    # rx.session() is used.
+    _async_db_url: ClassVar[str | None] = None
+    # Seconds to collect cell edits for before applying them together.
+    _edit_batch_window: ClassVar[float] = 0.1
+    _pending_edits: dict[Any, dict[str, Any]] = {}
+    _edit_flush_scheduled: bool = False
+    # Maximum number of ids in the IN list of each bulk DELETE statement.
+    _delete_chunk_size: ClassVar[int] = 500
+    # Show a toolbar button deleting every row matching the current filter.
+    _delete_matching_button: ClassVar[bool] = False
+    # Number of rows inserted by each executemany INSERT of a bulk import.
+    _import_chunk_size: ClassVar[int] = 1000
+    # Receive only the ids of the selected rows instead of their data. After
+    # select all (server-side row model), the selection is every row matching
+    # the filter model except the deselected ids. It is kept in _selection as
+    # {select_all, ids, filter_model} and _selected_items stays empty.
+    _compact_selection: ClassVar[bool] = False
+    _selection: dict[str, Any] = {}
+    # Apply the row changes published for the model by other sessions and by
+    # publish_row_changes while the grid is mounted, instead of showing stale
+    # rows until the next refresh. Changes are published within the process,
+    # multiple backend workers need sticky sessions or a shared broker.
+    _live_updates: ClassVar[bool] = False
+    # Seconds between checks that the watching client is still connected.
+    _live_updates_check_interval: ClassVar[float] = 30.0
+    _row_watch_id: str = ""
+    __data_row_count__ = True
     add_dialog_is_open: bool = False
+    import_dialog_is_open: bool = False
 
     async def _is_authorized(
         self,
@@ -262,10 +1015,15 @@ class ModelWrapper(AbstractWrapper, Generic[M]):
     ) -> bool:
         """Check if the user is authorized to perform the action.
 
+        Override this rather than _get_data to restrict reads: SELECT is also
+        checked before counting rows, exporting and pushing live row changes.
+
         For SELECT, action_data is None.
         For INSERT, action_data is a dictionary of the new row data.
         For UPDATE, action data is a dictionary of updated row data.
-        For DELETE, action data is a list of model objects to delete.
+        For DELETE, action data is a list of model objects to delete, the
+        selection dict in compact selection mode, or the filter model when
+        deleting every row matching a filter.
 
         Args:
             action: The action type.
@@ -277,7 +1035,30 @@ class ModelWrapper(AbstractWrapper, Generic[M]):
         return True
 
     def on_selection_changed(self, rows, source, type):
-        self._selected_items = [self._model_class(**row) for row in rows]
+        if not self._compact_selection:
+            self._selected_items = [
+                self._model_class(**row) for row in rows if not self._is_group_row(row)
+            ]
+            return
+        ids = (self._selected_id(row_id) for row_id in rows["ids"])
+        self._selection = {
+            "select_all": rows["select_all"],
+            "ids": [row_id for row_id in ids if row_id is not None],
+            "filter_model": rows["filter_model"] or {},
+        }
+
+    @classmethod
+    def _selected_id(cls, row_id: Any) -> Any | None:
+        """Convert a selected row id from the grid, None for group row ids."""
+        try:
+            return cls._coerce_value("id", row_id)
+        except ValueError:
+            return None
+
+    @classmethod
+    def _is_group_row(cls, row: dict[str, Any]) -> bool:
+        """Check if selected row data belongs to a group row, not a model row."""
+        return False
 
     async def on_value_setter(
         self, row_data: dict[str, Any], field_name: str, value: Any
@@ -286,45 +1067,407 @@ class ModelWrapper(AbstractWrapper, Generic[M]):
             ModelWrapperActionType.UPDATE, row_data | {field_name: value}
         ):
             return
-        try:
-            if self._model_class.__fields__[field_name].type_ == datetime.datetime:
-                value = datetime.datetime.fromisoformat(value)
-        except KeyError:
-            pass
-        with rx.session() as session:
-            item_orm = session.get(self._model_class, row_data["id"])
-            if item_orm is not None:
-                setattr(item_orm, field_name, value)
-                session.add(item_orm)
-                session.commit()
-                return self._grid_component.api.refreshInfiniteCache()
+        value = self._coerce_value(field_name, value)
+        self._pending_edits.setdefault(row_data["id"], {})[field_name] = value
+        if not self._edit_flush_scheduled:
+            self._edit_flush_scheduled = True
+            return type(self).flush_edits
+
+    @rx.background
+    async def flush_edits(self):
+        """Apply the edits collected during the batch window in one transaction.
+
+        Only the edited rows are re-read and updated in the grid. Edits made
+        while a batch is written are applied by the same flush right after,
+        so batches never commit out of order.
+        """
+        await asyncio.sleep(self._edit_batch_window)
+        while True:
+            async with self:
+                edits = self._pending_edits
+                self._pending_edits = {}
+                # stays set while writing, so that on_value_setter does not
+                # start a concurrent flush
+                self._edit_flush_scheduled = bool(edits)
+                origin = self.router.session.client_token
+            if not edits:
+                return
+            try:
+                rows = await self._write_edits(edits)
+            except Exception:
+                async with self:
+                    self._edit_flush_scheduled = False
+                raise
+            self._publish_row_changes(origin, updated=rows)
+            yield self._refresh_rows(rows)
+
+    async def _write_edits(self, edits: dict[Any, dict[str, Any]]) -> list[M]:
+        """Update the edited cells in one transaction.
+
+        Args:
+            edits: The new values of the edited fields, by row id.
+
+        Returns:
+            The edited rows, re-read after the update. Rows deleted in the
+            meantime are skipped.
+        """
+        # one executemany UPDATE per set of edited columns
+        params_by_fields: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for row_id, values in edits.items():
+            params_by_fields.setdefault(tuple(sorted(values)), []).append(
+                {"_id": row_id, **values}
+            )
+        table = self._model_class.__table__
+        async with asession(self._async_db_url) as session:
+            for params in params_by_fields.values():
+                await session.exec(
+                    update(table).where(table.c.id == bindparam("_id")),
+                    params=params,
+                )
+            await session.commit()
+            return (
+                await session.exec(
+                    select(self._model_class).where(
+                        col(self._model_class.id).in_(list(edits))
+                    )
+                )
+            ).all()
 
     async def on_add(self, row_data: dict[str, Any]):
         """Handles submitting a new row to the model."""
         if not await self._is_authorized(ModelWrapperActionType.INSERT, row_data):
             return
-        with rx.session() as session:
+        async with asession(self._async_db_url) as session:
             item = self._model_class(**row_data)
             session.add(item)
-            session.commit()
+            await session.commit()
+            await session.refresh(item)
+            self._publish_row_changes(self.router.session.client_token, added=[item])
             self.add_dialog_is_open = False
-            return self._grid_component.api.refreshInfiniteCache()
+            return self._refresh_data()
+
+    @classmethod
+    def _coerce_value(cls, field_name: str, value: Any) -> Any:
+        """Convert a value received as text to the type of the model field."""
+        field = cls._model_class.__fields__.get(field_name)
+        if field is None or not isinstance(value, str) or field.type_ is str:
+            return value
+        if value == "" and not field.required:
+            return None
+        if field.type_ is datetime.datetime:
+            return datetime.datetime.fromisoformat(value)
+        if field.type_ is bool:
+            return value.strip().lower() in ("true", "1", "yes", "y")
+        if field.type_ in (int, float):
+            return field.type_(value)
+        return value
+
+    async def _import_rows(self, rows: Iterable[dict[str, Any]]) -> int:
+        """Insert rows in executemany batches within a single transaction.
+
+        Unknown columns and the id are ignored, the values are coerced to the
+        field types and each row is checked with _is_authorized.
+
+        Args:
+            rows: The rows to insert, typically from a csv.DictReader.
+
+        Returns:
+            The number of rows inserted.
+
+        Raises:
+            ValueError: A value could not be coerced or a batch could not be
+                inserted, the transaction is rolled back. The message names the
+                failing row, counted from 1 after the header row.
+        """
+        fields = self._model_class.__fields__
+        table = self._model_class.__table__
+        rows = enumerate(rows, start=1)
+        inserted = 0
+        async with asession(self._async_db_url) as session:
+            try:
+                while batch := list(itertools.islice(rows, self._import_chunk_size)):
+                    params = []
+                    for row_number, row in batch:
+                        try:
+                            row_data = {
+                                field_name: self._coerce_value(field_name, value)
+                                for field_name, value in row.items()
+                                if field_name in fields and field_name != "id"
+                            }
+                        except (TypeError, ValueError) as e:
+                            raise ValueError(f"row {row_number}: {e}") from e
+                        if await self._is_authorized(
+                            ModelWrapperActionType.INSERT, row_data
+                        ):
+                            params.append(row_data)
+                    if not params:
+                        continue
+                    try:
+                        await session.exec(insert(table), params=params)
+                    except SQLAlchemyError as e:
+                        # executemany does not tell which row failed
+                        raise ValueError(
+                            f"rows {batch[0][0]} to {batch[-1][0]}: "
+                            f"{getattr(e, 'orig', None) or e}"
+                        ) from e
+                    inserted += len(params)
+            except ValueError:
+                await session.rollback()
+                raise
+            await session.commit()
+        if inserted:
+            self._publish_row_changes(self.router.session.client_token, refresh=True)
+        return inserted
+
+    async def on_import_upload(self, files: list[rx.UploadFile]):
+        """Handles importing the rows of uploaded CSV files with a header row."""
+        inserted = 0
+        for file in files:
+            reader = csv.DictReader(
+                io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+            )
+            try:
+                inserted += await self._import_rows(reader)
+            except ValueError as e:
+                return [
+                    self._refresh_data(),
+                    rx.toast.error(f"{file.filename} was not imported, {e}"),
+                ]
+        self.import_dialog_is_open = False
+        return [
+            self._refresh_data(),
+            rx.toast.success(f"Imported {inserted} rows."),
+        ]
+
+    async def on_import_paste(self, form_data: dict[str, Any]):
+        """Handles importing rows pasted from a spreadsheet, with a header row."""
+        text = form_data.get("text", "")
+        try:
+            dialect = csv.Sniffer().sniff(text.partition("\n")[0], delimiters="\t,;")
+        except csv.Error:
+            dialect = csv.excel_tab
+        try:
+            inserted = await self._import_rows(
+                csv.DictReader(io.StringIO(text), dialect=dialect)
+            )
+        except ValueError as e:
+            return rx.toast.error(f"Nothing was imported, {e}")
+        self.import_dialog_is_open = False
+        return [
+            self._refresh_data(),
+            rx.toast.success(f"Imported {inserted} rows."),
+        ]
+
+    async def _delete_ids(
+        self, session: AsyncSession | SyncSessionAdapter, ids: list[Any]
+    ):
+        """Delete rows by id, with one DELETE per _delete_chunk_size ids."""
+        for chunk_start in range(0, len(ids), self._delete_chunk_size):
+            await session.exec(
+                delete(self._model_class).where(
+                    col(self._model_class.id).in_(
+                        ids[chunk_start : chunk_start + self._delete_chunk_size]
+                    )
+                )
+            )
+
+    async def _delete_filtered(
+        self,
+        session: AsyncSession | SyncSessionAdapter,
+        filter_model: dict[str, Any],
+        exclude_ids: list[Any] | None = None,
+    ):
+        """Delete the rows matching the filter model with a single DELETE."""
+        query = apply_filter_model(self._model_class, filter_model)
+        if exclude_ids:
+            query = query.where(col(self._model_class.id).not_in(exclude_ids))
+        statement = delete(self._model_class)
+        if query.whereclause is not None:
+            statement = statement.where(query.whereclause)
+        await session.exec(statement)
 
     async def delete_selected(self):
         """Handles deleting selected rows from the model."""
-        if not await self._is_authorized(
-            ModelWrapperActionType.DELETE, self._selected_items
-        ):
+        selection = self._selection if self._compact_selection else self._selected_items
+        if not await self._is_authorized(ModelWrapperActionType.DELETE, selection):
             return
-        with rx.session() as session:
-            for item in session.exec(
-                self._model_class.select().where(
-                    self._model_class.id.in_([item.id for item in self._selected_items])
+        origin = self.router.session.client_token
+        async with asession(self._async_db_url) as session:
+            if not self._compact_selection:
+                ids = [item.id for item in selection]
+                await self._delete_ids(session, ids)
+                changes = {"removed": ids}
+            elif selection.get("select_all"):
+                await self._delete_filtered(
+                    session, selection["filter_model"], exclude_ids=selection["ids"]
                 )
-            ).all():
-                session.delete(item)
-            session.commit()
-            return self._grid_component.api.refreshInfiniteCache()
+                changes = {"refresh": True}
+            else:
+                ids = selection.get("ids", [])
+                await self._delete_ids(session, ids)
+                changes = {"removed": ids}
+            await session.commit()
+            self._publish_row_changes(origin, **changes)
+            return self._refresh_data()
+
+    async def delete_matching(self, filter_model: dict[str, Any]):
+        """Handles deleting every row matching the filter model.
+
+        The rows are deleted by a single DELETE statement, without loading them.
+        An empty filter model is refused instead of deleting the whole table.
+        """
+        if not filter_model:
+            return rx.toast.error("Set a filter to choose the rows to delete.")
+        if not await self._is_authorized(ModelWrapperActionType.DELETE, filter_model):
+            return
+        async with asession(self._async_db_url) as session:
+            await self._delete_filtered(session, filter_model)
+            await session.commit()
+            self._publish_row_changes(self.router.session.client_token, refresh=True)
+            return self._refresh_data()
+
+    @classmethod
+    def _invalidate_cached_data(cls):
+        """Drop any server-side data derived from the model after a write."""
+        _invalidate_keyset_cursors(cls._model_class)
+        invalidate_tag(cls._cache_tag())
+
+    @classmethod
+    def _cache_tag(cls) -> type[M]:
+        return cls._model_class
+
+    @classmethod
+    def _export_filename(cls) -> str:
+        return cls._model_class.__name__.lower()
+
+    def _export_columns(self, columns: list[str] | None) -> list[str]:
+        fields = list(self._model_class.__fields__)
+        return [column for column in columns or () if column in fields] or fields
+
+    def _export_column_types(self, columns: list[str]) -> list[type | None]:
+        table = self._model_class.__table__
+        return [
+            _python_type(table.c[column]) if column in table.c else None
+            for column in columns
+        ]
+
+    async def _export_rows(
+        self,
+        filter_model: dict[str, Any],
+        sort_model: list[dict[str, str]],
+        columns: list[str],
+    ) -> AsyncIterator[list[list[Any]]]:
+        """Stream the rows to export from one query, read with yield_per.
+
+        Only the exported columns are selected, and each chunk of
+        __export_chunk_size__ rows is encoded before the next is fetched.
+        When a subclass overrides _get_data, which may restrict what a session
+        reads, the rows are paged through it instead.
+        """
+        if not type(self)._get_data.__module__.startswith(f"{__package__}."):
+            async for rows in super()._export_rows(filter_model, sort_model, columns):
+                yield rows
+            return
+        if not await self._is_authorized(ModelWrapperActionType.SELECT, None):
+            return
+        query = (
+            apply_sort_model(
+                model=self._model_class,
+                query=apply_filter_model(
+                    model=self._model_class,
+                    filter_model=filter_model,
+                ),
+                sort_model=sort_model,
+            )
+            .with_only_columns(
+                *(col(getattr(self._model_class, column)) for column in columns)
+            )
+            .execution_options(yield_per=self.__export_chunk_size__)
+        )
+        async with asession(self._async_db_url) as session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                yield [list(row) for row in rows]
+
+    @classmethod
+    def _publish_row_changes(cls, origin: str | None, **changes: Any) -> None:
+        """Invalidate the cached data and push the changes to the live grids.
+
+        Args:
+            origin: Client token of the session making the change, its own
+                grid is refreshed by the handler instead.
+            **changes: The added, updated, removed and refresh changes.
+        """
+        cls._invalidate_cached_data()
+        publish(cls._model_class, _row_changes(origin=origin, **changes))
+
+    @classmethod
+    def _mount_handlers(cls) -> list[rx.event.EventHandler]:
+        """The event handlers triggered when the grid is mounted."""
+        handlers = super()._mount_handlers()
+        if cls._live_updates:
+            handlers.append(cls.watch_row_changes)
+        return handlers
+
+    @classmethod
+    def _apply_row_changes(cls, changes: RowChanges) -> rx.event.EventSpec:
+        """Apply published changes to the grid, reloading it when required.
+
+        The infinite row model reloads its blocks when rows are added or
+        removed, so it is only sent the updated rows it can replace in place.
+        """
+        if changes.refresh or (
+            cls.__row_model_type__ == "infinite" and (changes.added or changes.removed)
+        ):
+            return cls._refresh_data()
+        return cls._grid_component.apply_row_changes(
+            added=list(changes.added),
+            updated=list(changes.updated),
+            removed=list(changes.removed),
+        )
+
+    @rx.background
+    async def watch_row_changes(self):
+        """Apply the changes published for the model while the grid is mounted.
+
+        Changes made by this session are skipped, the handler making them
+        already refreshed the grid. The watch ends when the grid is mounted
+        again, the client disconnects or _is_authorized(SELECT) stops passing.
+        """
+        watch_id = uuid.uuid4().hex
+        async with self:
+            if not await self._is_authorized(ModelWrapperActionType.SELECT, None):
+                return
+            self._row_watch_id = watch_id
+            token = self.router.session.client_token
+        event_namespace = rx.utils.prerequisites.get_app().app.event_namespace
+        queue = subscribe(self._model_class)
+        try:
+            while True:
+                changes = []
+                with contextlib.suppress(asyncio.TimeoutError):
+                    changes.append(
+                        await asyncio.wait_for(
+                            queue.get(), self._live_updates_check_interval
+                        )
+                    )
+                async with self:
+                    if self._row_watch_id != watch_id or not await self._is_authorized(
+                        ModelWrapperActionType.SELECT, None
+                    ):
+                        return
+                if event_namespace is not None and (
+                    token not in event_namespace.token_to_sid
+                ):
+                    return
+                # coalesce the burst of changes queued while waiting
+                while not queue.empty():
+                    changes.append(queue.get_nowait())
+                changes = [change for change in changes if change.origin != token]
+                if changes:
+                    yield self._apply_row_changes(merge_changes(changes))
+        finally:
+            unsubscribe(self._model_class, queue)
 
     def _get_column_defs(self) -> list[ColumnDef]:
         return [
@@ -337,9 +1480,53 @@ class ModelWrapper(AbstractWrapper, Generic[M]):
             for field in self._model_class.__fields__.values()
         ]
 
-    def _row_count(self) -> int:
-        with rx.session() as session:
-            return session.exec(select(func.count(col(self._model_class.id)))).one()
+    async def _row_count(self, filter_model: dict[str, Any] | None = None) -> int:
+        if not await self._is_authorized(ModelWrapperActionType.SELECT, None):
+            return 0
+        filter_model = filter_model or {}
+        cache_key = (self._model_class, json.dumps(filter_model, sort_keys=True))
+        if self._row_count_cache is not None:
+            row_count = self._row_count_cache.get(cache_key)
+            if row_count is not None:
+                return row_count
+        query = apply_filter_model(self._model_class, filter_model)
+        async with asession(self._async_db_url) as session:
+            row_count = None
+            if self._row_count_approximate:
+                row_count = await session.run_sync(_estimate_row_count, query)
+            if row_count is None and filter_model:
+                row_count = (
+                    await session.exec(
+                        select(func.count()).select_from(query.subquery())
+                    )
+                ).one()
+            elif row_count is None:
+                row_count = (
+                    await session.exec(select(func.count(col(self._model_class.id))))
+                ).one()
+        if self._row_count_cache is not None:
+            self._row_count_cache.set(cache_key, row_count, tag=self._cache_tag())
+        return row_count
+
+    def _projected_fields(
+        self, columns: list[str] | None, sort_model: list[dict[str, str]]
+    ) -> list[str] | None:
+        """Get the fields to select for the displayed columns.
+
+        The id identifies the rows and the sorted fields are needed for keyset
+        pagination, so they are always selected.
+
+        Args:
+            columns: The displayed column ids, None for every field.
+            sort_model: The ag-grid sort model.
+
+        Returns:
+            The fields in model order, or None to select whole model rows.
+        """
+        if columns is None:
+            return None
+        wanted = {"id", *columns, *(spec["colId"] for spec in sort_model)}
+        return [field for field in self._model_class.__fields__ if field in wanted]
 
     async def _get_data(
         self,
@@ -347,22 +1534,141 @@ class ModelWrapper(AbstractWrapper, Generic[M]):
         end: int,
         filter_model: dict[str, Any] | None = None,
         sort_model: list[dict[str, str]] | None = None,
-    ) -> list[M]:
+        columns: list[str] | None = None,
+    ) -> list[M] | list[dict[str, Any]]:
         if not await self._is_authorized(ModelWrapperActionType.SELECT, None):
             return []
-        with rx.session() as session:
-            return session.exec(
-                apply_sort_model(
-                    model=self._model_class,
-                    query=apply_filter_model(
-                        model=self._model_class,
-                        filter_model=filter_model or {},
-                    ),
-                    sort_model=sort_model or [],
+        filter_model = filter_model or {}
+        sort_model = sort_model or []
+        fields = self._projected_fields(columns, sort_model)
+        cache_key = None
+        if self._block_cache is not None:
+            cache_key = (
+                *_view_key(self._model_class, filter_model, sort_model),
+                start,
+                end,
+                fields and tuple(fields),
+            )
+            rows = self._block_cache.get(cache_key)
+            if rows is not None:
+                return rows
+        get_data = (
+            self._get_data_keyset if self._keyset_pagination else self._get_data_offset
+        )
+        rows = await get_data(
+            start=start,
+            end=end,
+            filter_model=filter_model,
+            sort_model=sort_model,
+            fields=fields,
+        )
+        if cache_key is not None:
+            self._block_cache.set(cache_key, rows, tag=self._cache_tag())
+        return rows
+
+    async def _get_data_offset(
+        self,
+        start: int,
+        end: int,
+        filter_model: dict[str, Any],
+        sort_model: list[dict[str, str]],
+        fields: list[str] | None = None,
+    ) -> list[M] | list[dict[str, Any]]:
+        """Fetch a block using OFFSET and LIMIT."""
+        query = apply_sort_model(
+            model=self._model_class,
+            query=apply_filter_model(
+                model=self._model_class,
+                filter_model=filter_model,
+            ),
+            sort_model=sort_model,
+        )
+        return await self._fetch_rows(query.offset(start).limit(end - start), fields)
+
+    async def _fetch_rows(
+        self, query: Select, fields: list[str] | None
+    ) -> list[M] | list[dict[str, Any]]:
+        """Run a model query, selecting only the given fields if not None.
+
+        Args:
+            query: The query selecting the model.
+            fields: The fields to select, from _projected_fields.
+
+        Returns:
+            Model rows, or dicts of the selected fields.
+        """
+        async with asession(self._async_db_url) as session:
+            if fields is None:
+                return (await session.exec(query)).all()
+            result = await session.execute(
+                query.with_only_columns(
+                    *(col(getattr(self._model_class, field)) for field in fields)
                 )
-                .offset(start)
-                .limit(end - start)
-            ).all()
+            )
+            return [dict(row._mapping) for row in result.all()]
+
+    async def _get_data_keyset(
+        self,
+        start: int,
+        end: int,
+        filter_model: dict[str, Any],
+        sort_model: list[dict[str, str]],
+        fields: list[str] | None = None,
+    ) -> list[M] | list[dict[str, Any]]:
+        """Fetch a block using keyset pagination.
+
+        The sort key of the last row of each block is remembered, so that the
+        following block can seek directly past it. Blocks requested without a
+        known cursor (for example, when jumping straight to the end of the
+        grid) fall back to OFFSET and record a cursor for the next block.
+
+        The seek predicates never match NULL, and NULLs sort first or last
+        depending on the backend, so views sorted by a nullable column are
+        always paged with OFFSET.
+
+        Args:
+            start: The index of the first row in the block.
+            end: The index after the last row in the block.
+            filter_model: The ag-grid filter model.
+            sort_model: The ag-grid sort model.
+            fields: The fields to select, None for whole model rows.
+
+        Returns:
+            The rows in the block.
+        """
+        sort_model = keyset_sort_model(self._model_class, sort_model)
+        view = _view_key(self._model_class, filter_model, sort_model)
+        query = apply_sort_model(
+            model=self._model_class,
+            query=apply_filter_model(
+                model=self._model_class,
+                filter_model=filter_model,
+            ),
+            sort_model=sort_model,
+        )
+        table = self._model_class.__table__
+        seekable = not any(
+            table.c.get(spec["colId"]) is None or table.c[spec["colId"]].nullable
+            for spec in sort_model
+        )
+        last_key = _get_keyset_cursor(view, start) if start and seekable else None
+        if last_key is not None:
+            query = query.where(
+                where_keyset(self._model_class, sort_model, last_key),
+            )
+        else:
+            query = query.offset(start)
+        rows = await self._fetch_rows(query.limit(end - start), fields)
+        if rows and seekable:
+            key = tuple(_row_values(rows[-1], [spec["colId"] for spec in sort_model]))
+            _set_keyset_cursor(view, start + len(rows), key)
+        return rows
+
+    @classmethod
+    def get_component(cls, *children, **props) -> rx.Component:
+        if cls._compact_selection:
+            props.setdefault("selection_id_key", "id")
+        return super().get_component(*children, **props)
 
     @classmethod
     def _add_dialog_field(cls, field: str, ftype: Type) -> rx.Component:
@@ -408,6 +1714,43 @@ class ModelWrapper(AbstractWrapper, Generic[M]):
             on_open_change=cls.set_add_dialog_is_open,
         )
 
+    @classmethod
+    def _import_dialog(cls) -> rx.Component:
+        """Create the dialog for importing rows from a CSV file or the clipboard."""
+        upload_id = f"import_{cls.get_full_name()}".replace(".", "_")
+        return rx.dialog.root(
+            rx.dialog.trigger(
+                rx.icon_button("upload"),
+            ),
+            rx.dialog.content(
+                rx.dialog.title(f"Import {cls._model_class.__name__} rows"),
+                rx.upload(
+                    rx.text("Drop a CSV file with a header row, or click to select"),
+                    id=upload_id,
+                    accept={"text/csv": [".csv"]},
+                    max_files=1,
+                    border="1px dotted",
+                    padding="1em",
+                ),
+                rx.button(
+                    "Import file",
+                    on_click=cls.on_import_upload(rx.upload_files(upload_id=upload_id)),
+                    margin="5px",
+                ),
+                rx.form(
+                    rx.text_area(
+                        name="text",
+                        placeholder="Or paste rows copied from a spreadsheet, "
+                        "including the header row",
+                    ),
+                    rx.button("Import pasted rows", margin="5px"),
+                    on_submit=cls.on_import_paste,
+                ),
+            ),
+            open=cls.import_dialog_is_open,
+            on_open_change=cls.set_import_dialog_is_open,
+        )
+
     @classmethod
     def _delete_button(cls) -> rx.Component:
         """Create the delete button."""
@@ -416,11 +1759,61 @@ class ModelWrapper(AbstractWrapper, Generic[M]):
             on_click=cls.delete_selected,
         )
 
+    @classmethod
+    def _delete_matching_dialog(cls) -> rx.Component:
+        """Create the dialog confirming the deletion of the filtered rows."""
+        return rx.alert_dialog.root(
+            rx.alert_dialog.trigger(
+                rx.icon_button("trash-2", color_scheme="red"),
+            ),
+            rx.alert_dialog.content(
+                rx.alert_dialog.title("Delete matching rows"),
+                rx.alert_dialog.description(
+                    f"Delete every {cls._model_class.__name__} matching the "
+                    "current filter? This cannot be undone."
+                ),
+                rx.hstack(
+                    rx.alert_dialog.cancel(rx.button("Cancel", variant="soft")),
+                    rx.alert_dialog.action(
+                        rx.button(
+                            "Delete",
+                            color_scheme="red",
+                            on_click=cls._grid_component.api.getFilterModel(
+                                callback=cls.delete_matching,
+                            ),
+                        ),
+                    ),
+                    justify="end",
+                    margin_top="10px",
+                ),
+            ),
+        )
+
+    @classmethod
+    def _export_menu(cls) -> rx.Component:
+        """Create the menu exporting the filtered rows in the available formats."""
+        labels = {"csv": "CSV", "xlsx": "Excel", "parquet": "Parquet"}
+        return rx.menu.root(
+            rx.menu.trigger(rx.icon_button("download")),
+            rx.menu.content(
+                *(
+                    rx.menu.item(
+                        labels.get(export_format, export_format),
+                        on_click=cls.export_data(export_format),
+                    )
+                    for export_format in EXPORT_FORMATS
+                ),
+            ),
+        )
+
     @classmethod
     def _top_toolbar(cls) -> rx.Component:
         """Create the top toolbar."""
         return rx.hstack(
+            cls._export_menu(),
+            *([cls._delete_matching_dialog()] if cls._delete_matching_button else []),
             cls._delete_button(),
+            cls._import_dialog(),
             cls._add_dialog(),
             justify="end",
             margin="5px",